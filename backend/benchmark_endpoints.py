@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+"""
+Benchmark every API endpoint through FastAPI's TestClient.
+
+Generates a synthetic database with generate_data.py, times each endpoint
+and writes the results as JSON. With --baseline, medians are compared
+against an earlier results file and the exit status is 1 when any
+endpoint got slower than the tolerance allows.
+
+GET endpoints are timed twice: "cold" bumps the data version before every
+call so the response and overview caches miss, "cached" repeats the
+same request.
+
+Usage: python benchmark_endpoints.py [--transactions 10000] [--repeat 20]
+                                     [--output results.json] [--baseline baseline.json]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmark_import import write_statement_csv
+from generate_data import generate
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+GET_CASES = [
+    ("transactions", "/api/transactions?limit=1000"),
+    ("transactions page", "/api/transactions?limit=50"),
+    ("transactions search", "/api/transactions?limit=100&search=zomato"),
+    ("transactions filtered", "/api/transactions?limit=100&category_id=1&start_date=2025-01-01T00:00:00"),
+    ("accounts", "/api/accounts"),
+    ("categories", "/api/categories"),
+    ("budgets", "/api/budgets"),
+    ("analytics overview", "/api/analytics/overview"),
+    ("analytics category-breakdown", "/api/analytics/category-breakdown"),
+    ("analytics monthly-trend", "/api/analytics/monthly-trend"),
+    ("analytics account-distribution", "/api/analytics/account-distribution"),
+    ("analytics top-merchants", "/api/analytics/top-merchants"),
+    ("merchant-mappings", "/api/merchant-mappings"),
+    ("merchant-mappings index-stats", "/api/merchant-mappings/index-stats"),
+    ("accounts balances verify", "/api/accounts/balances/verify"),
+    ("import jobs", "/api/import/jobs"),
+]
+
+
+def transaction_payload(i):
+    return {"account_id": 1, "category_id": 1, "amount": 100 + i, "title": f"Benchmark {i}",
+            "date": "2025-06-01T10:00:00", "is_income": False}
+
+
+def time_calls(call, repeat, before=None):
+    """Milliseconds of repeat calls, after one untimed warm-up"""
+    call(0)
+    timings = []
+    for i in range(1, repeat + 1):
+        if before:
+            before()
+        started = time.perf_counter()
+        call(i)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def summarize(timings):
+    ordered = sorted(timings)
+    return {
+        "runs": len(ordered),
+        "min_ms": round(ordered[0], 3),
+        "median_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+    }
+
+
+def run_cases(main, client, repeat, workdir):
+    def get(path):
+        def call(i):
+            client.get(path).raise_for_status()
+        return call
+
+    def request(method, path_fn, body_fn=None, **kwargs):
+        def call(i):
+            body = body_fn(i) if body_fn else None
+            client.request(method, path_fn(i), json=body, **kwargs).raise_for_status()
+        return call
+
+    results = {}
+    def bump():
+        # A new data version makes the next GET miss the response cache
+        db = main.SessionLocal()
+        try:
+            main.bump_data_version(db, 1)
+            db.commit()
+        finally:
+            db.close()
+
+    for name, path in GET_CASES:
+        results[f"GET {name} (cold)"] = time_calls(get(path), repeat, before=bump)
+        results[f"GET {name} (cached)"] = time_calls(get(path), repeat)
+
+    created = []
+
+    def create(i):
+        response = client.post("/api/transactions", json=transaction_payload(i))
+        response.raise_for_status()
+        created.append(response.json()["id"])
+
+    results["POST transactions"] = time_calls(create, repeat)
+    results["PUT transactions"] = time_calls(request(
+        "PUT", lambda i: f"/api/transactions/{created[i]}", transaction_payload), repeat)
+    results["DELETE transactions"] = time_calls(request(
+        "DELETE", lambda i: f"/api/transactions/{created.pop()}"), repeat)
+    results["POST transactions bulk (100)"] = time_calls(request(
+        "POST", lambda i: "/api/transactions/bulk",
+        lambda i: [transaction_payload(i * 100 + j) for j in range(100)]), repeat)
+
+    csv_path = os.path.join(workdir, "import.csv")
+    write_statement_csv(csv_path, 1000)
+    with open(csv_path, "rb") as f:
+        csv_bytes = f.read()
+    results["POST import csv (1000)"] = time_calls(lambda i: client.post(
+        "/api/import/csv", files={"file": ("import.csv", csv_bytes, "text/csv")}
+    ).raise_for_status(), repeat)
+
+    results["POST analytics rollups rebuild"] = time_calls(request(
+        "POST", lambda i: "/api/analytics/rollups/rebuild"), repeat)
+    results["POST accounts balances rebuild"] = time_calls(request(
+        "POST", lambda i: "/api/accounts/balances/rebuild"), repeat)
+    return {name: summarize(timings) for name, timings in results.items()}
+
+
+def compare(results, baseline, tolerance):
+    """Print median changes against baseline; True if anything regressed"""
+    if baseline["meta"].get("transactions") != results["meta"]["transactions"]:
+        print(f"warning: baseline has {baseline['meta'].get('transactions')} transactions, "
+              f"this run {results['meta']['transactions']}")
+    regressed = False
+    print(f"\n{'endpoint':<46} {'baseline':>10} {'now':>10} {'change':>8}")
+    for name, stats in results["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:<46} {'-':>10} {stats['median_ms']:>10.2f}      new")
+            continue
+        change = stats["median_ms"] / before["median_ms"] - 1 if before["median_ms"] else 0
+        flag = ""
+        if change > tolerance:
+            flag, regressed = "  REGRESSION", True
+        print(f"{name:<46} {before['median_ms']:>10.2f} {stats['median_ms']:>10.2f} "
+              f"{change:>+8.0%}{flag}")
+    return regressed
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--transactions", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed median slowdown before failing (0.2 = 20%%)")
+    args = parser.parse_args()
+    output = os.path.abspath(args.output)
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # main binds its engine to DATABASE_URL when imported and keeps its
+        # other files relative to the working directory
+        os.chdir(workdir)
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+        sys.path.insert(0, BACKEND_DIR)
+        import main
+        from fastapi.testclient import TestClient
+
+        started = time.perf_counter()
+        counts = generate(main, args.transactions, args.users, args.seed)
+        print(f"Generated {counts['transactions']} transactions in "
+              f"{time.perf_counter() - started:.1f}s")
+
+        with TestClient(main.app) as client:
+            stats = run_cases(main, client, args.repeat, workdir)
+
+    results = {
+        "meta": {
+            "transactions": args.transactions,
+            "users": args.users,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+        },
+        "results": stats,
+    }
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"\n{'endpoint':<46} {'median ms':>10} {'p95 ms':>10}")
+    for name, s in stats.items():
+        print(f"{name:<46} {s['median_ms']:>10.2f} {s['p95_ms']:>10.2f}")
+    print(f"\n✓ Results written to {output}")
+
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
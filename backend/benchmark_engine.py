@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""
+Benchmark concurrent reads and writes against SQLite under the default
+and the tuned engine profiles (see SQLITE_PRAGMAS in main.py).
+
+Readers list a page of transactions and compute the overview; writers
+insert single transactions and commit each one, like POST /api/transactions.
+
+Usage: python benchmark_engine.py [--rows 100000] [--readers 4] [--writers 1] [--seconds 10]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+from sqlalchemy import insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from benchmark_import import write_statement_csv
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def seed(db_path, rows, main):
+    """Create a database holding rows synthetic transactions"""
+    csv_path = db_path + ".csv"
+    write_statement_csv(csv_path, rows)
+    engine = main.create_db_engine(f"sqlite:///{db_path}", "default")
+    main.Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    main.import_transactions_frame(pd.read_csv(csv_path), db, user_id=1)
+    db.commit()
+    db.close()
+    engine.dispose()
+    os.remove(csv_path)
+
+
+def reader(Session, main, stop, counts):
+    db = Session()
+    start_of_month = datetime(datetime.now().year, datetime.now().month, 1)
+    while not stop.is_set():
+        try:
+            db.query(main.Transaction).filter(main.Transaction.user_id == 1).order_by(
+                main.Transaction.date.desc(), main.Transaction.id.desc()).limit(50).all()
+            main.compute_overview(db, 1, start_of_month)
+            db.rollback()
+            counts["reads"] += 1
+        except OperationalError:
+            db.rollback()
+            counts["errors"] += 1
+    db.close()
+
+
+def writer(Session, main, stop, counts, seed):
+    rng = random.Random(seed)
+    db = Session()
+    while not stop.is_set():
+        try:
+            db.execute(insert(main.Transaction.__table__).values(
+                user_id=1, account_id=1, category_id=1, amount=rng.randrange(10, 5000),
+                currency="INR", title="Benchmark", date=datetime.now(), is_income=False))
+            db.commit()
+            counts["writes"] += 1
+        except OperationalError:
+            db.rollback()
+            counts["errors"] += 1
+    db.close()
+
+
+def run(db_path, profile, main, readers, writers, seconds):
+    """Run readers and writers against db_path for seconds; ops per second"""
+    engine = main.create_db_engine(f"sqlite:///{db_path}", profile)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    stop = threading.Event()
+    threads = [threading.Thread(target=reader, args=(Session, main, stop, counts))
+               for _ in range(readers)]
+    threads += [threading.Thread(target=writer, args=(Session, main, stop, counts, i))
+                for i in range(writers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    engine.dispose()
+    return {name: count / seconds for name, count in counts.items()}
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=1)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # main opens ./finance_tracker.db on import; keep it in the scratch dir
+        os.chdir(workdir)
+        sys.path.insert(0, BACKEND_DIR)
+        import main
+
+        print(f"{'profile':>8} {'reads/s':>10} {'writes/s':>10} {'errors/s':>10}")
+        for profile in ("default", "tuned"):
+            db_path = os.path.join(workdir, f"{profile}.db")
+            seed(db_path, args.rows, main)
+            rates = run(db_path, profile, main, args.readers, args.writers, args.seconds)
+            print(f"{profile:>8} {rates['reads']:>10,.1f} {rates['writes']:>10,.1f} "
+                  f"{rates['errors']:>10,.1f}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""
+Compare the transaction export formats by size and time.
+
+Generates a database with generate_data.py and downloads every
+transaction as NDJSON and CSV (GET /api/transactions/export) and as Parquet
+and Arrow IPC (GET /api/export/transactions), then the full snapshot
+archive. The columnar formats need pyarrow and are skipped without it.
+
+Usage: python benchmark_export.py [--transactions 500000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from generate_data import generate
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+CASES = [
+    ("ndjson", "/api/transactions/export?format=ndjson"),
+    ("csv", "/api/transactions/export?format=csv"),
+    ("parquet", "/api/export/transactions?format=parquet"),
+    ("arrow ipc", "/api/export/transactions?format=arrow"),
+    ("snapshot parquet", "/api/export/snapshot?format=parquet"),
+    ("snapshot arrow", "/api/export/snapshot?format=arrow"),
+]
+
+
+def download(client, path):
+    """(seconds, bytes) of one GET"""
+    started = time.perf_counter()
+    response = client.get(path)
+    response.raise_for_status()
+    return time.perf_counter() - started, len(response.content)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--transactions", type=int, default=500000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+        sys.path.insert(0, BACKEND_DIR)
+        import main
+        from fastapi.testclient import TestClient
+
+        generate(main, args.transactions)
+        client = TestClient(main.app)
+
+        print(f"{args.transactions} transactions")
+        print(f"{'format':<18} {'time':>9} {'size':>12}")
+        baseline = None
+        for label, path in CASES:
+            if not main.ARROW_AVAILABLE and "/api/export/" in path:
+                print(f"{label:<18} skipped, pyarrow is not installed")
+                continue
+            seconds, size = download(client, path)
+            baseline = baseline or size
+            print(f"{label:<18} {seconds:8.2f}s {size / 1e6:9.1f} MB  "
+                  f"({size / baseline:.1%} of ndjson)")
+
+
+if __name__ == "__main__":
+    main_cli()
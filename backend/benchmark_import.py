@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+"""
+Benchmark /api/import/csv: the vectorized pipeline against the old
+row-by-row implementation, on synthetic CSV files of increasing size.
+
+Usage: python benchmark_import.py [--sizes 10000 100000 1000000] [--legacy-max N]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+ACCOUNTS = ["Supermoney", "FlipkartAxis", "DebitCard", "TN HDFC",
+            "IciciAmazon", "Hdfc Pixel", "IciciSapphiro", "Kotak"]
+CATEGORIES = ["Shopping", "Home", "Education", "Groceries", "Healthcare",
+              "Food", "Bills & Fees", "Travel", "Dining", "Salary"]
+TITLES = ["Zomato", "Swiggy", "Grocery zepto", "Fish", "Chicken", "Internet",
+          "Reliance smart bazar", "Nila fashion", "Amazon", "Uber", "Petrol",
+          "Electricity bill", "Salary credit", "Cashback", "Medicines"]
+
+
+def write_statement_csv(path, rows, seed=42):
+    """Write a synthetic CSV in the format /api/import/csv accepts"""
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1)
+    with open(path, "w") as f:
+        f.write("date,title,amount,category name,account,currency,income,note\n")
+        for i in range(rows):
+            category = rng.choice(CATEGORIES)
+            date = start + timedelta(minutes=rng.randrange(0, 60 * 24 * 365 * 6))
+            note = "" if rng.random() < 0.7 else f"note {i}"
+            f.write(f"{date.strftime('%d-%m-%Y %H:%M')},{rng.choice(TITLES)},"
+                    f"{rng.randrange(10, 20000)},{category},{rng.choice(ACCOUNTS)},"
+                    f"INR,{category == 'Salary'},{note}\n")
+
+
+def legacy_import(df, db, main):
+    """The pre-vectorization import_csv body, kept for comparison"""
+    Account, Category, Transaction = main.Account, main.Category, main.Transaction
+    account_map = {}
+    category_map = {}
+
+    for _, row in df.iterrows():
+        if row['account'] not in account_map:
+            account = db.query(Account).filter(
+                Account.user_id == 1,
+                Account.name == row['account']
+            ).first()
+            if not account:
+                account = Account(
+                    user_id=1, name=row['account'], account_type="imported")
+                db.add(account)
+                db.commit()
+                db.refresh(account)
+            account_map[row['account']] = account.id
+
+        if row['category name'] not in category_map:
+            category = db.query(Category).filter(
+                Category.user_id == 1,
+                Category.name == row['category name']
+            ).first()
+            if not category:
+                cat_type = "income" if row['income'] else "expense"
+                category = Category(
+                    user_id=1,
+                    name=row['category name'],
+                    type=cat_type,
+                    color="#6366f1",
+                    icon="💰"
+                )
+                db.add(category)
+                db.commit()
+                db.refresh(category)
+            category_map[row['category name']] = category.id
+
+        transaction = Transaction(
+            user_id=1,
+            account_id=account_map[row['account']],
+            category_id=category_map[row['category name']],
+            amount=row['amount'],
+            currency=row['currency'],
+            title=row['title'],
+            note=row['note'] if pd.notna(row['note']) else None,
+            date=datetime.strptime(row['date'], '%d-%m-%Y %H:%M'),
+            is_income=row['income'],
+            merchant=row['title']
+        )
+        db.add(transaction)
+
+    db.commit()
+    return len(df)
+
+
+def vectorized_import(df, db, main):
+    count = main.import_transactions_frame(df, db, user_id=1)
+    db.commit()
+    return count
+
+
+def run(csv_path, db_path, import_fn, main):
+    """Time read_csv + import + commit into a fresh database"""
+    engine = create_engine(f"sqlite:///{db_path}",
+                           connect_args={"check_same_thread": False})
+    main.Base.metadata.create_all(bind=engine)
+    main.setup_transaction_search(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        started = time.perf_counter()
+        count = import_fn(pd.read_csv(csv_path), db, main)
+        return count, time.perf_counter() - started
+    finally:
+        db.close()
+        engine.dispose()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[10000, 100000, 1000000])
+    parser.add_argument("--legacy-max", type=int, default=None,
+                        help="skip the legacy import above this many rows")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # main opens ./finance_tracker.db on import; keep it in the scratch dir
+        os.chdir(workdir)
+        sys.path.insert(0, BACKEND_DIR)
+        import main
+
+        print(f"{'rows':>10} {'implementation':>15} {'seconds':>10} {'rows/s':>12}")
+        for size in args.sizes:
+            csv_path = os.path.join(workdir, f"statement_{size}.csv")
+            write_statement_csv(csv_path, size)
+
+            implementations = [("vectorized", vectorized_import)]
+            if args.legacy_max is None or size <= args.legacy_max:
+                implementations.insert(0, ("legacy", legacy_import))
+
+            for name, import_fn in implementations:
+                db_path = os.path.join(workdir, f"{name}_{size}.db")
+                count, seconds = run(csv_path, db_path, import_fn, main)
+                print(f"{count:>10} {name:>15} {seconds:>10.2f} {count / seconds:>12,.0f}")
+            os.remove(csv_path)
+
+
+if __name__ == "__main__":
+    main_cli()
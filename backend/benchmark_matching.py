@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+"""
+Benchmark create_smart_mappings' statement matching: ReferenceMatcher
+against the old per-line scan of the reference DataFrame.
+
+The matcher runs over every statement line; the scan is slow enough that
+it only runs on a sample, from which its full running time is
+extrapolated and the agreement between the two is measured.
+
+Usage: python benchmark_matching.py [--reference 50000] [--statements 50000] [--legacy-sample 300]
+"""
+import argparse
+import random
+import time
+from difflib import SequenceMatcher
+
+import pandas as pd
+
+from create_smart_mappings import ReferenceMatcher
+from statement_parsers import clean_upi_titles
+
+SYLLABLES = ["ka", "ri", "mo", "sha", "tan", "vi", "ra", "lu", "pe", "no", "dar", "kum",
+             "ar", "in", "su", "bha", "ga", "ma", "li", "sen", "das", "roy", "pal", "jit"]
+SUFFIXES = ["", " stores", " enterprise", " traders", " mart", " foods", " medical",
+            " pvt ltd", " & sons", " services"]
+CATEGORIES = ["Food", "Groceries", "Shopping", "Travel", "Bills & Fees", "Healthcare"]
+
+
+def merchant_names(rng, count):
+    names = set()
+    while len(names) < count:
+        first = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3)))
+        last = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3)))
+        names.add(f"{first} {last}{rng.choice(SUFFIXES)}".title())
+    return sorted(names)
+
+
+def typo(rng, text):
+    """Drop, swap or repeat one character"""
+    if len(text) < 4:
+        return text
+    i = rng.randrange(1, len(text) - 1)
+    edit = rng.random()
+    if edit < 0.33:
+        return text[:i] + text[i + 1:]
+    if edit < 0.66:
+        return text[:i - 1] + text[i] + text[i - 1] + text[i + 1:]
+    return text[:i] + text[i] + text[i:]
+
+
+def workload(reference_rows, statement_rows, seed=7):
+    """Synthetic input.csv rows and statement lines sharing merchants"""
+    rng = random.Random(seed)
+    merchants = merchant_names(rng, max(100, reference_rows // 10))
+    reference = pd.DataFrame({
+        "title": [rng.choice(merchants) if rng.random() > 0.01 else None
+                  for _ in range(reference_rows)],
+        "amount": [float(rng.randrange(10, 20000)) if rng.random() > 0.2 else
+                   round(rng.uniform(10, 20000), 2) for _ in range(reference_rows)],
+        "category name": [rng.choice(CATEGORIES) for _ in range(reference_rows)],
+    })
+    known = reference["amount"].tolist()
+
+    titles, amounts = [], []
+    for i in range(statement_rows):
+        merchant = rng.choice(merchants)
+        # Half the lines carry an amount input.csv has, half do not
+        amount = rng.choice(known) if rng.random() < 0.5 else rng.randrange(20001, 40000) + 0.5
+        if rng.random() < 0.8:
+            title = f"UPI/{typo(rng, merchant.upper())}/{merchant.lower().replace(' ', '')}@okaxis/UPI/{rng.randrange(10**11, 10**12)}"
+        else:
+            title = f"POS {rng.randrange(10**11, 10**12)} {merchant.upper()}"
+        titles.append(title)
+        amounts.append(amount)
+    clean_titles = clean_upi_titles(pd.Series(titles)).tolist()
+    statements = [{"statement_title": title, "clean_title": clean_title, "amount": amount}
+                  for title, clean_title, amount in zip(titles, clean_titles, amounts)]
+    return reference, statements
+
+
+def legacy_find_best_match(statement_title, clean_title, amount, reference_df):
+    """The pre-index find_best_match, kept for comparison"""
+    valid_ref_df = reference_df[reference_df['title'].notna()]
+
+    if len(valid_ref_df) == 0:
+        return None
+
+    exact_matches = valid_ref_df[valid_ref_df['amount'] == amount]
+
+    if len(exact_matches) > 0:
+        for _, ref_row in exact_matches.iterrows():
+            ref_title = str(ref_row['title']).strip(
+            ).lower() if pd.notna(ref_row['title']) else ''
+            if ref_title == clean_title.lower():
+                return ref_row['title'], ref_row.get('category name')
+
+        best_match = None
+        best_category = None
+        best_overlap = 0
+
+        for _, ref_row in exact_matches.iterrows():
+            ref_title = str(ref_row['title']).strip(
+            ).lower() if pd.notna(ref_row['title']) else ''
+
+            statement_words = set(clean_title.lower().split())
+            ref_words = set(ref_title.split())
+
+            common_words = {'the', 'and', 'or', 'a', 'an', 'in', 'on', 'at', 'to',
+                            'for', 'of', 'by', 'transfer', 'dr', 'cr', 'payment', 'funds', 'account'}
+            statement_words -= common_words
+            ref_words -= common_words
+
+            word_overlap = len(statement_words & ref_words)
+
+            if word_overlap > best_overlap:
+                best_overlap = word_overlap
+                best_match = ref_row['title']
+                best_category = ref_row.get('category name')
+
+        if best_match is not None:
+            return best_match, best_category
+
+        first_match = exact_matches.iloc[0]
+        return first_match['title'], first_match.get('category name')
+
+    if clean_title and clean_title != statement_title:
+        best_match = None
+        best_category = None
+        best_similarity = 0.4
+
+        for _, ref_row in valid_ref_df.iterrows():
+            ref_title = str(ref_row['title']).strip(
+            ).lower() if pd.notna(ref_row['title']) else ''
+
+            similarity = SequenceMatcher(
+                None, clean_title.lower(), ref_title).ratio()
+
+            if similarity > best_similarity:
+                best_similarity = similarity
+                best_match = ref_row['title']
+                best_category = ref_row.get('category name')
+
+        if best_match is not None:
+            return best_match, best_category
+
+    return None, None
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reference", type=int, default=50000)
+    parser.add_argument("--statements", type=int, default=50000)
+    parser.add_argument("--legacy-sample", type=int, default=300,
+                        help="statement lines to run through the old scan")
+    args = parser.parse_args()
+
+    reference, statements = workload(args.reference, args.statements)
+    print(f"Workload: {args.reference} reference rows x {args.statements} statement lines")
+
+    started = time.perf_counter()
+    matcher = ReferenceMatcher(reference)
+    build_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    results = [matcher.match(s["statement_title"], s["clean_title"], s["amount"])
+               for s in statements]
+    match_seconds = time.perf_counter() - started
+
+    sample = random.Random(1).sample(range(len(statements)), min(args.legacy_sample, len(statements)))
+    agree = {"exact": [0, 0], "fuzzy": [0, 0]}
+    started = time.perf_counter()
+    for i in sample:
+        s = statements[i]
+        expected = legacy_find_best_match(s["statement_title"], s["clean_title"], s["amount"], reference)
+        kind = "exact" if (reference["amount"] == s["amount"]).any() else "fuzzy"
+        agree[kind][1] += 1
+        agree[kind][0] += tuple(expected) == tuple(results[i])
+    legacy_seconds = (time.perf_counter() - started) / len(sample) * len(statements)
+
+    print(f"index build:           {build_seconds:10.2f} s")
+    print(f"indexed matching:      {match_seconds:10.2f} s  ({len(statements) / match_seconds:,.0f} lines/s)")
+    print(f"old scan (estimated):  {legacy_seconds:10.0f} s  (from {len(sample)} sampled lines)")
+    print(f"speed-up:              {legacy_seconds / (build_seconds + match_seconds):10.0f}x")
+    for kind, (same, total) in agree.items():
+        if total:
+            print(f"agreement ({kind} amount): {same}/{total} ({same / total:.1%})")
+
+
+if __name__ == "__main__":
+    main_cli()
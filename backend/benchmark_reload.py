@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""
+Benchmark POST /api/merchant-mappings/reload on a large input.csv.
+
+Writes a synthetic input.csv, generates a small database with
+generate_data.py and times three reloads: the first inserts every
+mapping, the second finds nothing new and the third after a tenth of the
+rows changed category.
+
+Usage: python benchmark_reload.py [--rows 100000] [--backend-dir DIR]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from generate_data import CATEGORIES, generate
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def write_input_csv(path, rows, seed=3, changed=0.0):
+    """input.csv rows: title, amount, category name; changed re-rolls the
+    category of that share of rows"""
+    rng = random.Random(seed)
+    names = [c[0] for c in CATEGORIES]
+    records = []
+    for i in range(rows):
+        category = rng.choice(names)
+        if rng.random() < changed:
+            category = names[(names.index(category) + 1) % len(names)]
+        records.append({"title": f"Merchant {i % (rows // 4 + 1)}",
+                        "amount": round(rng.uniform(10, 20000), 2),
+                        "category name": category})
+    pd.DataFrame(records).to_csv(path, index=False)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--backend-dir", default=BACKEND_DIR,
+                        help="backend to test, e.g. a checkout of an older commit")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # main reads ../input_data/input.csv relative to its working directory
+        run_dir = os.path.join(workdir, "run")
+        os.makedirs(run_dir)
+        os.makedirs(os.path.join(workdir, "input_data"))
+        csv_path = os.path.join(workdir, "input_data", "input.csv")
+        os.chdir(run_dir)
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(run_dir, 'bench.db')}"
+        sys.path.insert(0, args.backend_dir)
+        import main
+        from fastapi.testclient import TestClient
+
+        generate(main, 1000)
+        client = TestClient(main.app)
+
+        def reload(label):
+            started = time.perf_counter()
+            response = client.post("/api/merchant-mappings/reload")
+            response.raise_for_status()
+            seconds = time.perf_counter() - started
+            body = response.json()
+            print(f"{label:<28} {seconds:8.2f} s   saved {body['count']}, "
+                  f"updated {body.get('updated', '-')}")
+
+        print(f"input.csv with {args.rows} rows")
+        write_input_csv(csv_path, args.rows)
+        reload("first reload")
+        reload("reload, nothing changed")
+        write_input_csv(csv_path, args.rows, changed=0.1)
+        reload("reload, 10% recategorized")
+
+
+if __name__ == "__main__":
+    main_cli()
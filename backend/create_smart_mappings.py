@@ -3,40 +3,32 @@
 Create intelligent merchant mappings by matching statement files with input.csv
 """
 import pandas as pd
+import hashlib
 import sqlite3
-import re
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
-from pathlib import Path
+from difflib import SequenceMatcher
 import os
+from merchant_mapping_key import MAPPING_KEY, ensure_mapping_key
+from statement_parsers import detect_statement_format, empty_statement, parse_statement, read_statement_rows
 
-
-def clean_upi_title(title):
-    """
-    Extract merchant name from UPI title like 'UPI/CHANDAN SARKAR/bharatpe...'
-    Returns the cleaned merchant name
-    """
-    if not title:
-        return title
-
-    title_str = str(title).strip()
-    title_upper = title_str.upper()
-
-    # Check if it's a UPI transaction
-    if title_upper.startswith('UPI/') or title_upper.startswith('UPICC/'):
-        parts = title_str.split('/')
-        if len(parts) >= 2:
-            merchant_name = parts[1].strip()
-            if merchant_name:
-                return merchant_name
-
-    return title_str
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    try:
+        import fastparquet  # noqa: F401
+        PARQUET_AVAILABLE = True
+    except ImportError:
+        PARQUET_AVAILABLE = False
 
 
 def load_reference_data():
     """Load the reference data from input.csv"""
     try:
-        csv_path = "../input_data/input.csv"
-        df = pd.read_csv(csv_path)
+        df = pd.read_csv(REFERENCE_CSV)
         print(f"✓ Loaded reference data (input.csv): {len(df)} rows")
         return df
     except Exception as e:
@@ -44,331 +36,392 @@ def load_reference_data():
         return None
 
 
-def load_all_statements():
-    """Load all statement Excel files from input_data folder"""
-    input_dir = "../input_data"
-    all_transactions = []
+STATEMENTS_DIR = "../input_data"
+REFERENCE_CSV = os.path.join(STATEMENTS_DIR, "input.csv")
+# Parsed statements, keyed by file content hash; bump the version when the
+# parsing changes so stale entries are ignored
+STATEMENT_CACHE_DIR = "./statement_cache"
+STATEMENT_CACHE_VERSION = 2
+# Columns of the statement lines handed to the matching below
+MATCH_COLUMNS = ['statement_title', 'clean_title', 'amount']
+
+
+def parse_statement_file(file_path):
+    """Parse one statement with its registered format (statement_parsers).
+
+    Returns (DataFrame, None), or (None, message) for files to skip.
+    Runs in a worker process.
+    """
+    file_name = os.path.basename(file_path)
+    rows = read_statement_rows(file_path, file_name)
+
+    # Skip if too few rows
+    if len(rows) < 4:
+        return None, "✗ File too small"
+
+    statement_format = detect_statement_format(file_name, rows)
+    if statement_format is None:
+        return empty_statement(), None
+    return parse_statement(rows, statement_format), None
+
 
-    # Find all Excel files
+def file_digest(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def statement_cache_path(digest):
+    # Parquet when pyarrow/fastparquet is installed, pickle otherwise
+    ext = "parquet" if PARQUET_AVAILABLE else "pickle"
+    return os.path.join(STATEMENT_CACHE_DIR, f"v{STATEMENT_CACHE_VERSION}-{digest}.{ext}")
+
+
+def read_cached_statement(digest):
+    path = statement_cache_path(digest)
+    if not os.path.exists(path):
+        return None
+    try:
+        return pd.read_parquet(path) if PARQUET_AVAILABLE else pd.read_pickle(path)
+    except Exception as e:
+        print(f"  ⚠ Ignoring unreadable cache entry {path}: {e}")
+        return None
+
+
+def write_cached_statement(digest, df):
+    os.makedirs(STATEMENT_CACHE_DIR, exist_ok=True)
+    path = statement_cache_path(digest)
+    tmp_path = path + ".tmp"
+    if PARQUET_AVAILABLE:
+        df.to_parquet(tmp_path, index=False)
+    else:
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def find_statement_files(input_dir=STATEMENTS_DIR):
+    """Statement Excel files in input_dir, sorted"""
     excel_files = []
     for file in os.listdir(input_dir):
         if file.endswith(('.xls', '.xlsx')) and not file.startswith('~'):
             excel_files.append(os.path.join(input_dir, file))
+    return sorted(excel_files)
 
-    print(f"\nFound {len(excel_files)} statement files:")
 
-    for file_path in sorted(excel_files):
-        try:
-            file_name = os.path.basename(file_path)
-            print(f"  - Reading {file_name}...", end=" ")
+def load_all_statements(input_dir=STATEMENTS_DIR, max_workers=None, digests=None, failed=None):
+    """Load all statement Excel files from input_data folder.
 
-            # Read Excel file
-            df = pd.read_excel(file_path, sheet_name=0)
+    Unchanged files come from the cache; the rest are parsed in parallel,
+    one file per worker process. Pass digests ({path: file_digest(path)})
+    to load just those files; paths that could not be read are added to
+    the failed set, if given.
+    """
+    all_transactions = []
 
-            # Skip if too few rows
-            if len(df) < 3:
-                print(f"✗ File too small")
-                continue
+    if digests is None:
+        digests = {path: file_digest(path) for path in find_statement_files(input_dir)}
+    excel_files = sorted(digests)
 
-            transaction_count = 0
-
-            # Determine file type and parse accordingly
-            if 'Acct_Statement' in file_name:  # HDFC Account Statements
-                # These have bank header in first column name
-                # Find the row with actual headers
-                for start_idx in range(len(df)):
-                    row_str = str(df.iloc[start_idx].values).lower()
-                    if any(x in row_str for x in ['date', 'description', 'withdrawal', 'deposit']):
-                        df = pd.read_excel(
-                            file_path, sheet_name=0, header=start_idx)
-                        break
-
-                # Extract transactions from HDFC format
-                for _, row in df.iterrows():
-                    # Try to find amount in debit/credit columns
-                    title = None
-                    amount = 0
-
-                    for i, val in enumerate(row):
-                        val_str = str(val).lower()
-                        # Look for description column
-                        if pd.notna(val) and len(str(val)) > 10 and any(x not in val_str for x in ['date', 'balance', 'opening', 'closing']):
-                            title = str(val).strip()
-                            break
-
-                    # Find numeric amount
-                    for val in row:
-                        if pd.notna(val):
-                            try:
-                                amount = float(str(val).replace(
-                                    ',', '').replace('₹', '').strip())
-                                if 0 < amount < 1000000:  # Reasonable transaction amount
-                                    break
-                            except:
-                                pass
-
-                    if title and amount > 0 and len(title) > 3:
-                        clean_title = clean_upi_title(title)
-                        all_transactions.append({
-                            'file': file_name,
-                            'statement_title': title,
-                            'clean_title': clean_title,
-                            'amount': amount
-                        })
-                        transaction_count += 1
-
-            # Recent CC Statement (Well-formatted)
-            elif 'CC_Statement_2026' in file_name:
-                # This one has proper headers
-                for _, row in df.iterrows():
-                    title = str(row['Transaction Details']).strip() if pd.notna(
-                        row['Transaction Details']) else ''
-                    try:
-                        amount_val = str(row['Amount (INR)']).replace(
-                            ',', '').replace('₹', '').strip()
-                        amount = float(amount_val) if amount_val else 0
-                    except:
-                        amount = 0
-
-                    if title and amount > 0 and len(title) > 3:
-                        clean_title = clean_upi_title(title)
-                        all_transactions.append({
-                            'file': file_name,
-                            'statement_title': title,
-                            'clean_title': clean_title,
-                            'amount': amount
-                        })
-                        transaction_count += 1
-
-            elif 'CC_Statement_2025' in file_name:  # Old CC Statements
-                # Find transaction start row - look for "Date" keyword
-                data_start = 0
-                for idx in range(len(df)):
-                    row_str = str(df.iloc[idx].values).lower()
-                    if 'date' in row_str and 'transaction' in row_str:
-                        data_start = idx + 1
-                        break
-
-                if data_start > 0:
-                    df_data = df.iloc[data_start:].reset_index(drop=True)
-
-                    for _, row in df_data.iterrows():
-                        title = None
-                        amount = 0
-
-                        # Extract from columns
-                        for i in range(len(row)):
-                            val = row.iloc[i]
-                            if pd.notna(val):
-                                val_str = str(val).strip()
-                                # Look for transaction detail (longer text)
-                                if len(val_str) > 10 and not any(x in val_str.lower() for x in ['date', 'total', 'page']):
-                                    title = val_str
-                                    break
-
-                        # Find amount
-                        for i in range(len(row)-1, 0, -1):
-                            val = row.iloc[i]
-                            if pd.notna(val):
-                                try:
-                                    amount = float(str(val).replace(
-                                        ',', '').replace('₹', '').strip())
-                                    if 0 < amount < 1000000:
-                                        break
-                                except:
-                                    pass
-
-                        if title and amount > 0 and len(title) > 3:
-                            clean_title = clean_upi_title(title)
-                            all_transactions.append({
-                                'file': file_name,
-                                'statement_title': title,
-                                'clean_title': clean_title,
-                                'amount': amount
-                            })
-                            transaction_count += 1
-
-            elif 'CCStatement_Past' in file_name:  # Old Past CC Statement
-                # Find transactions - look for row with data
-                for start_idx in range(len(df)):
-                    row = df.iloc[start_idx]
-                    row_str = ' '.join([str(x) for x in row if pd.notna(x)])
-                    if any(x in row_str.lower() for x in ['date', 'amount', 'transaction']):
-                        df = pd.read_excel(
-                            file_path, sheet_name=0, header=start_idx)
-                        break
-
-                for _, row in df.iterrows():
-                    title = None
-                    amount = 0
-
-                    # Get transaction details and amount
-                    for col in df.columns:
-                        if 'transaction' in str(col).lower() or 'narration' in str(col).lower():
-                            title = str(row[col]).strip() if pd.notna(
-                                row[col]) else None
-                        elif 'amount' in str(col).lower():
-                            try:
-                                amount = float(str(row[col]).replace(
-                                    ',', '').replace('₹', '').strip())
-                            except:
-                                pass
-
-                    if title and amount > 0 and len(title) > 3:
-                        clean_title = clean_upi_title(title)
-                        all_transactions.append({
-                            'file': file_name,
-                            'statement_title': title,
-                            'clean_title': clean_title,
-                            'amount': amount
-                        })
-                        transaction_count += 1
-
-            if transaction_count > 0:
-                print(f"✓ {transaction_count} transactions")
-            else:
-                print(f"⚠ No transactions found")
+    print(f"\nFound {len(excel_files)} statement files:")
 
-        except Exception as e:
-            print(f"✗ Error: {str(e)[:50]}")
+    results = {}
+    to_parse = {}
+    for file_path in excel_files:
+        digest = digests[file_path]
+        cached = read_cached_statement(digest)
+        if cached is not None:
+            results[file_path] = (cached, None, True)
+        else:
+            to_parse[file_path] = digest
+
+    if to_parse:
+        workers = min(len(to_parse), max_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(parse_statement_file, path): path for path in to_parse}
+            for future in as_completed(futures):
+                file_path = futures[future]
+                try:
+                    transactions, message = future.result()
+                except Exception as e:
+                    results[file_path] = (None, f"✗ Error: {str(e)[:50]}", False)
+                    if failed is not None:
+                        failed.add(file_path)
+                    continue
+                if transactions is not None:
+                    write_cached_statement(to_parse[file_path], transactions)
+                results[file_path] = (transactions, message, False)
+
+    for file_path in excel_files:
+        file_name = os.path.basename(file_path)
+        transactions, message, from_cache = results[file_path]
+        if message:
+            print(f"  - Reading {file_name}... {message}")
             continue
+        source = " (cached)" if from_cache else ""
+        if len(transactions):
+            print(f"  - Reading {file_name}... ✓ {len(transactions)} transactions{source}")
+        else:
+            print(f"  - Reading {file_name}... ⚠ No transactions found{source}")
+        for transaction in transactions[MATCH_COLUMNS].to_dict('records'):
+            all_transactions.append({'file': file_name, **transaction})
 
     print(
         f"\n✓ Total transactions from all statements: {len(all_transactions)}")
     return all_transactions
 
 
-def find_best_match(statement_title, clean_title, amount, reference_df):
-    """
-    Find the best matching title from input.csv based on amount and title similarity
-    Priority:
-    1. Exact amount match + title match
-    2. Exact amount match (use first valid title)
-    3. String similarity match (for UPI/cleaned titles)
-    4. Return None if no match found (will use statement title as fallback)
-    """
-    from difflib import SequenceMatcher
-
-    # Filter out rows with null titles
-    valid_ref_df = reference_df[reference_df['title'].notna()]
+# Words ignored when comparing titles by word overlap
+COMMON_WORDS = {'the', 'and', 'or', 'a', 'an', 'in', 'on', 'at', 'to',
+                'for', 'of', 'by', 'transfer', 'dr', 'cr', 'payment', 'funds', 'account'}
+FUZZY_THRESHOLD = 0.4  # Minimum similarity for the fuzzy fallback
+FUZZY_SHORTLIST = 50  # Titles scored per fuzzy lookup
 
-    if len(valid_ref_df) == 0:
-        return None
 
-    # Strategy 1: Exact amount match
-    exact_matches = valid_ref_df[valid_ref_df['amount'] == amount]
-
-    if len(exact_matches) > 0:
-        # Check if any title matches the clean statement title
-        for _, ref_row in exact_matches.iterrows():
-            ref_title = str(ref_row['title']).strip(
-            ).lower() if pd.notna(ref_row['title']) else ''
-            if ref_title == clean_title.lower():
-                return ref_row['title'], ref_row.get('category name')
-
-        # Check for word overlap
-        best_match = None
-        best_category = None
-        best_overlap = 0
-
-        for _, ref_row in exact_matches.iterrows():
-            ref_title = str(ref_row['title']).strip(
-            ).lower() if pd.notna(ref_row['title']) else ''
-
-            # Count word matches
-            statement_words = set(clean_title.lower().split())
-            ref_words = set(ref_title.split())
-
-            # Remove common words
-            common_words = {'the', 'and', 'or', 'a', 'an', 'in', 'on', 'at', 'to',
-                            'for', 'of', 'by', 'transfer', 'dr', 'cr', 'payment', 'funds', 'account'}
-            statement_words -= common_words
-            ref_words -= common_words
-
-            word_overlap = len(statement_words & ref_words)
-
-            if word_overlap > best_overlap:
-                best_overlap = word_overlap
-                best_match = ref_row['title']
-                best_category = ref_row.get('category name')
-
-        # If we found an exact amount match, use it
-        if best_match is not None:
-            return best_match, best_category
-
-        # Otherwise, just use the first exact match
-        first_match = exact_matches.iloc[0]
-        return first_match['title'], first_match.get('category name')
-
-    # Strategy 2: String similarity match (for UPI transactions and cleaned titles)
-    if clean_title and clean_title != statement_title:
-        # Try to find similar titles
-        best_match = None
-        best_category = None
-        best_similarity = 0.4  # Minimum similarity threshold
-
-        for _, ref_row in valid_ref_df.iterrows():
-            ref_title = str(ref_row['title']).strip(
-            ).lower() if pd.notna(ref_row['title']) else ''
-
-            similarity = SequenceMatcher(
-                None, clean_title.lower(), ref_title).ratio()
+def amount_paise(amount):
+    return int(round(float(amount) * 100))
 
-            if similarity > best_similarity:
-                best_similarity = similarity
-                best_match = ref_row['title']
-                best_category = ref_row.get('category name')
 
-        if best_match is not None:
-            return best_match, best_category
+def title_trigrams(title):
+    padded = f"  {title} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
 
-    # No good match found
-    return None, None
 
+class ReferenceMatcher:
+    """
+    Match statement lines against input.csv without rescanning it per line.
+
+    Rows are bucketed by amount in integer paise for the exact amount
+    strategies. Distinct normalized titles are indexed by character
+    trigram, so the similarity fallback only runs SequenceMatcher on the
+    titles sharing the most trigrams with the statement title.
+
+    Results match the old full scan except that:
+    - amounts are equal when they agree to the paisa (the scan compared
+      floats exactly)
+    - the fuzzy fallback only considers the FUZZY_SHORTLIST titles with
+      the most shared trigrams, so a match sharing almost no trigrams
+      with the statement title can be missed
+    """
 
-def create_merchant_mappings():
-    """Create merchant mappings from statement files matched with input.csv"""
+    def __init__(self, reference_df, shortlist=FUZZY_SHORTLIST):
+        valid_ref_df = reference_df[reference_df['title'].notna()]
+        categories = valid_ref_df['category name'] if 'category name' in valid_ref_df else [
+            None] * len(valid_ref_df)
+        self.rows = list(zip(valid_ref_df['title'], categories))
+        self.shortlist = shortlist
+
+        self.normalized = [str(title).strip().lower() for title, _ in self.rows]
+        self.words = [set(title.split()) - COMMON_WORDS for title in self.normalized]
+
+        self.by_amount = {}
+        for i, amount in enumerate(valid_ref_df['amount']):
+            if pd.notna(amount):
+                self.by_amount.setdefault(amount_paise(amount), []).append(i)
+
+        # One entry per distinct title, pointing at its first row
+        self.titles = []
+        self.title_rows = []
+        self.trigrams = {}
+        # SequenceMatcher caches its analysis of the second sequence, so
+        # each reference title keeps one and only the statement side changes
+        self.scorers = {}
+        self.fuzzy_results = {}
+        seen = set()
+        for i, title in enumerate(self.normalized):
+            if title in seen:
+                continue
+            seen.add(title)
+            for trigram in title_trigrams(title):
+                self.trigrams.setdefault(trigram, []).append(len(self.titles))
+            self.titles.append(title)
+            self.title_rows.append(i)
+
+    def match(self, statement_title, clean_title, amount):
+        """
+        Find the best matching title from input.csv based on amount and title similarity
+        Priority:
+        1. Exact amount match + title match
+        2. Exact amount match (use first valid title)
+        3. String similarity match (for UPI/cleaned titles)
+        4. Return None if no match found (will use statement title as fallback)
+        """
+        if not self.rows:
+            return None
+
+        # Strategy 1: Exact amount match
+        bucket = self.by_amount.get(amount_paise(amount)) if pd.notna(amount) else None
+        if bucket:
+            target = clean_title.lower()
+            for i in bucket:
+                if self.normalized[i] == target:
+                    return self.rows[i]
+
+            # Check for word overlap
+            statement_words = set(target.split()) - COMMON_WORDS
+            best_row, best_overlap = None, 0
+            for i in bucket:
+                word_overlap = len(statement_words & self.words[i])
+                if word_overlap > best_overlap:
+                    best_row, best_overlap = i, word_overlap
+            if best_row is not None:
+                return self.rows[best_row]
+
+            # Otherwise, just use the first exact match
+            return self.rows[bucket[0]]
+
+        # Strategy 2: String similarity match (for UPI transactions and cleaned titles)
+        if clean_title and clean_title != statement_title:
+            target = clean_title.lower()
+            if target not in self.fuzzy_results:
+                self.fuzzy_results[target] = self._fuzzy_match(target)
+            if self.fuzzy_results[target] is not None:
+                return self.rows[self.fuzzy_results[target]]
+
+        # No good match found
+        return None, None
+
+    def _fuzzy_match(self, target):
+        """Row of the most similar shortlisted title above FUZZY_THRESHOLD"""
+        shared = Counter()
+        for trigram in title_trigrams(target):
+            shared.update(self.trigrams.get(trigram, ()))
+        # Score in row order so ties go to the earliest row, as in a scan
+        candidates = sorted(t for t, _ in shared.most_common(self.shortlist))
+
+        best_title, best_similarity = None, FUZZY_THRESHOLD
+        for t in candidates:
+            matcher = self.scorers.get(t)
+            if matcher is None:
+                matcher = self.scorers[t] = SequenceMatcher(None, "", self.titles[t])
+            matcher.set_seq1(target)
+            # The quick ratios are upper bounds of ratio()
+            if matcher.real_quick_ratio() <= best_similarity or matcher.quick_ratio() <= best_similarity:
+                continue
+            similarity = matcher.ratio()
+            if similarity > best_similarity:
+                best_title, best_similarity = t, similarity
+        return self.title_rows[best_title] if best_title is not None else None
+
+
+def find_best_match(statement_title, clean_title, amount, matcher):
+    """Best (title, category name) for a statement line, see ReferenceMatcher.match"""
+    return matcher.match(statement_title, clean_title, amount)
+
+
+# Source recorded on the mappings written here; rows from any other source
+# (manual, input.csv, or unknown on older rows) are never overwritten
+MAPPING_SOURCE = 'statement'
+
+UPSERT_MAPPING_SQL = f"""
+    INSERT INTO merchant_mappings
+    (user_id, amount, statement_title, clean_title, mapped_title, category_id, source, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT ({MAPPING_KEY}) DO UPDATE SET
+        clean_title = excluded.clean_title,
+        mapped_title = excluded.mapped_title,
+        category_id = excluded.category_id
+    WHERE merchant_mappings.source = excluded.source
+    AND (merchant_mappings.clean_title IS NOT excluded.clean_title
+         OR merchant_mappings.mapped_title IS NOT excluded.mapped_title
+         OR merchant_mappings.category_id IS NOT excluded.category_id)
+"""
 
-    # Load reference data
-    reference_df = load_reference_data()
-    if reference_df is None:
-        return False
+UPSERT_MANIFEST_SQL = """
+    INSERT INTO statement_files (file_name, sha256, lines, processed_at)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT (file_name) DO UPDATE SET
+        sha256 = excluded.sha256,
+        lines = excluded.lines,
+        processed_at = excluded.processed_at
+"""
 
-    # Load all statements
-    statements = load_all_statements()
-    if not statements:
-        print("✗ No statement data found")
-        return False
 
-        # Connect to database
+def ensure_mapping_schema(conn):
+    """Add what incremental runs need (source column, unique mapping key,
+    statement_files manifest) to databases main.py has not updated yet"""
+    removed = ensure_mapping_key(conn)
+    if removed:
+        print(f"  - Merged {removed} duplicate mappings")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS statement_files (
+            file_name VARCHAR NOT NULL PRIMARY KEY,
+            sha256 VARCHAR,
+            lines INTEGER,
+            processed_at DATETIME
+        )
+    """)
+    conn.commit()
+
+
+def create_merchant_mappings(full=False, db_path='./finance_tracker.db'):
+    """Create merchant mappings from statement files matched with input.csv.
+
+    Only statement files that are new or changed since the last run (per
+    the statement_files manifest) are matched, unless input.csv changed or
+    full is set. Results are upserted, so manual mappings are kept; a full
+    run also drops generated mappings whose statement lines are gone.
+    """
     try:
-        conn = sqlite3.connect('./finance_tracker.db')
+        conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
+        ensure_mapping_schema(conn)
+
+        cursor.execute("SELECT file_name, sha256 FROM statement_files")
+        manifest = dict(cursor.fetchall())
+
+        # Work out which statement files need matching
+        reference_file = os.path.basename(REFERENCE_CSV)
+        reference_digest = file_digest(REFERENCE_CSV) if os.path.exists(REFERENCE_CSV) else None
+        digests = {path: file_digest(path) for path in find_statement_files()}
+        if full or manifest.get(reference_file) != reference_digest:
+            changed = digests
+        else:
+            changed = {path: digest for path, digest in digests.items()
+                       if manifest.get(os.path.basename(path)) != digest}
+        print(f"\n{len(digests) - len(changed)} of {len(digests)} statement files unchanged since the last run")
+        if not changed:
+            print("✓ Merchant mappings are up to date")
+            conn.close()
+            return True
+
+        # Load reference data
+        reference_df = load_reference_data()
+        if reference_df is None:
+            conn.close()
+            return False
+
+        matcher = ReferenceMatcher(reference_df)
+
+        # Load the new and changed statements
+        failed = set()
+        statements = load_all_statements(digests=changed, failed=failed)
+        if not statements and changed is digests:
+            print("✗ No statement data found")
+            conn.close()
+            return False
 
         # Load categories for ID lookup
         cursor.execute("SELECT id, name FROM categories")
         category_map = {name.lower(): id for id, name in cursor.fetchall()}
         print(f"✓ Loaded {len(category_map)} categories for mapping")
 
-        # Truncate merchant_mappings table
-        print("\nTruncating merchant_mappings table...")
-        cursor.execute("DELETE FROM merchant_mappings")
-        conn.commit()
-
         # Create mappings
         print(f"\nCreating merchant mappings...")
         matched_count = 0
         unmatched_count = 0
+        now = datetime.utcnow().isoformat()
 
-        # Use a set to avoid duplicates
-        processed = set()
+        # One row per mapping key: amount in paise and normalized title
+        rows = {}
+        lines_per_file = Counter()
 
         for stmt in statements:
-            # Create a unique key
-            key = f"{stmt['amount']}_{stmt['statement_title']}"
-            if key in processed:
+            lines_per_file[stmt['file']] += 1
+            key = (round(stmt['amount'] * 100), stmt['statement_title'].strip().lower())
+            if key in rows:
                 continue
-            processed.add(key)
 
             statement_title = stmt['statement_title']
             clean_title = stmt['clean_title']
@@ -376,7 +429,7 @@ def create_merchant_mappings():
 
             # Find best match in input.csv
             mapped_result = find_best_match(
-                statement_title, clean_title, amount, reference_df)
+                statement_title, clean_title, amount, matcher)
             mapped_title, category_name = mapped_result if mapped_result else (
                 None, None)
 
@@ -392,13 +445,47 @@ def create_merchant_mappings():
                 # Use clean title if no match found
                 mapped_title_display = clean_title
 
-            # Insert into database
-            cursor.execute("""
-                INSERT INTO merchant_mappings 
-                (user_id, amount, statement_title, clean_title, mapped_title, category_id, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (1, amount, statement_title, clean_title, mapped_title_display, category_id, datetime.utcnow().isoformat()))
+            rows[key] = (1, amount, statement_title, clean_title, mapped_title_display,
+                         category_id, MAPPING_SOURCE, now)
 
+        cursor.execute("SELECT COUNT(*) FROM merchant_mappings")
+        before = cursor.fetchone()[0]
+        changes = conn.total_changes
+        cursor.executemany(UPSERT_MAPPING_SQL, rows.values())
+        written = conn.total_changes - changes
+        cursor.execute("SELECT COUNT(*) FROM merchant_mappings")
+        inserted = cursor.fetchone()[0] - before
+
+        stale = 0
+        if changed is digests and not failed:
+            # Every statement was matched, so generated rows not seen this run are stale
+            cursor.execute("""
+                CREATE TEMP TABLE run_keys (
+                    amount_paise INTEGER, title_key VARCHAR,
+                    PRIMARY KEY (amount_paise, title_key)
+                )
+            """)
+            cursor.executemany("""
+                INSERT OR IGNORE INTO run_keys
+                VALUES (CAST(round(? * 100) AS INTEGER), lower(trim(?)))
+            """, [(row[1], row[2]) for row in rows.values()])
+            cursor.execute("""
+                DELETE FROM merchant_mappings
+                WHERE user_id = 1 AND source = ? AND NOT EXISTS (
+                    SELECT 1 FROM run_keys k
+                    WHERE k.amount_paise = CAST(round(merchant_mappings.amount * 100) AS INTEGER)
+                    AND k.title_key = lower(trim(merchant_mappings.statement_title))
+                )
+            """, (MAPPING_SOURCE,))
+            stale = cursor.rowcount
+            cursor.execute("DROP TABLE run_keys")
+
+        # Files that could not be read are retried next run
+        manifest_rows = [(os.path.basename(path), digest, lines_per_file[os.path.basename(path)], now)
+                         for path, digest in changed.items() if path not in failed]
+        if reference_digest:
+            manifest_rows.append((reference_file, reference_digest, len(reference_df), now))
+        cursor.executemany(UPSERT_MANIFEST_SQL, manifest_rows)
         conn.commit()
 
         # Show statistics
@@ -409,6 +496,10 @@ def create_merchant_mappings():
         print(f"  - Total: {total}")
         print(f"  - Matched with input.csv: {matched_count}")
         print(f"  - Using fallback (clean) titles: {unmatched_count}")
+        print(f"  - New: {inserted}, updated: {written - inserted}, "
+              f"unchanged or kept (manual or older): {len(rows) - written}")
+        if stale:
+            print(f"  - Removed {stale} generated mappings no longer in any statement")
 
         # Show sample mappings
         cursor.execute("""
@@ -436,7 +527,8 @@ if __name__ == "__main__":
     print("Intelligent Merchant Mapping Generator")
     print("=" * 60)
 
-    success = create_merchant_mappings()
+    # --full rematches every statement file, not just new or changed ones
+    success = create_merchant_mappings(full='--full' in sys.argv[1:])
 
     if success:
         print("\n" + "=" * 60)
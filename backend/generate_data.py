@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+"""
+Generate a deterministic synthetic finance_tracker database.
+
+Creates users with their accounts, categories, budgets, merchant mappings
+and transactions in the app's schema, then builds the summary tables. The
+same --seed always produces the same rows.
+
+Usage: python generate_data.py --output bench.db [--transactions 100000] [--users 1] [--seed 42]
+"""
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+ACCOUNTS = [
+    ("Supermoney", "wallet", "#8b5cf6"), ("FlipkartAxis", "credit_card", "#ec4899"),
+    ("DebitCard", "bank", "#3b82f6"), ("TN HDFC", "bank", "#10b981"),
+    ("IciciAmazon", "credit_card", "#f59e0b"), ("Hdfc Pixel", "credit_card", "#ef4444"),
+    ("IciciSapphiro", "credit_card", "#06b6d4"), ("Kotak", "bank", "#8b5cf6"),
+]
+# name, type, color, icon, share of transactions, typical amount
+CATEGORIES = [
+    ("Food", "expense", "#f97316", "🍔", 0.22, 350),
+    ("Groceries", "expense", "#22c55e", "🛒", 0.18, 900),
+    ("Shopping", "expense", "#ec4899", "🛍️", 0.12, 2200),
+    ("Travel", "expense", "#3b82f6", "✈️", 0.08, 1500),
+    ("Bills & Fees", "expense", "#eab308", "🧾", 0.08, 1800),
+    ("Healthcare", "expense", "#ef4444", "💊", 0.05, 1200),
+    ("Home", "expense", "#a855f7", "🏠", 0.06, 3000),
+    ("Education", "expense", "#14b8a6", "📚", 0.03, 5000),
+    ("Dining", "expense", "#f43f5e", "🍽️", 0.10, 1400),
+    ("Salary", "income", "#10b981", "💰", 0.02, 150000),
+    ("Cashback", "income", "#84cc16", "🎁", 0.06, 120),
+]
+MERCHANTS = {
+    "Food": ["Zomato", "Swiggy", "Dominos", "Chai Point"],
+    "Groceries": ["Zepto", "Blinkit", "Reliance Smart Bazar", "Fish Market", "Chicken Shop"],
+    "Shopping": ["Amazon", "Flipkart", "Myntra", "Nila Fashion"],
+    "Travel": ["Uber", "Ola", "IRCTC", "Indigo", "Petrol Pump"],
+    "Bills & Fees": ["Airtel", "Jio Fiber", "CESC Electricity", "Credit Card Fee"],
+    "Healthcare": ["Apollo Pharmacy", "Medplus", "Practo"],
+    "Home": ["Urban Company", "Pepperfry", "Society Maintenance"],
+    "Education": ["Coursera", "Udemy", "School Fees"],
+    "Dining": ["Barbeque Nation", "Mainland China", "Haldirams"],
+    "Salary": ["Salary Credit"],
+    "Cashback": ["Card Cashback", "UPI Cashback"],
+}
+HISTORY_DAYS = 3 * 365
+
+
+def statement_title(rng, merchant):
+    """A bank-statement style title for a merchant"""
+    handle = merchant.lower().replace(" ", "")
+    ref = rng.integers(10**11, 10**12)
+    if rng.random() < 0.7:
+        return f"UPI/{merchant.upper()}/{handle}@ybl/Payment/{ref}"
+    return f"POS {ref} {merchant.upper()}"
+
+
+def generate(main, transactions=100000, users=1, seed=42):
+    """Fill main's database with synthetic data; returns row counts"""
+    rng = np.random.default_rng(seed)
+    now = datetime(2026, 1, 1)
+    db = main.SessionLocal()
+    counts = {"users": users, "accounts": 0, "categories": 0, "budgets": 0,
+              "merchant_mappings": 0, "transactions": 0}
+    try:
+        user_ids = []
+        for u in range(users):
+            user = main.User(email="demo@finance.com" if u == 0 else f"user{u}@finance.com",
+                             name="Demo User" if u == 0 else f"User {u}")
+            db.add(user)
+            db.flush()
+            user_ids.append(user.id)
+
+        account_ids, categories = {}, {}
+        for user_id in user_ids:
+            account_ids[user_id] = []
+            for name, account_type, color in ACCOUNTS:
+                account = main.Account(user_id=user_id, name=name,
+                                       account_type=account_type, color=color)
+                db.add(account)
+                db.flush()
+                account_ids[user_id].append(account.id)
+            categories[user_id] = []
+            for name, cat_type, color, icon, share, amount in CATEGORIES:
+                category = main.Category(user_id=user_id, name=name, type=cat_type,
+                                         color=color, icon=icon)
+                db.add(category)
+                db.flush()
+                categories[user_id].append((category.id, name, share, amount, cat_type))
+                if cat_type == "expense":
+                    start = datetime(now.year, now.month, 1)
+                    db.add(main.Budget(user_id=user_id, category_id=category.id,
+                                       amount=amount * 30, period="monthly",
+                                       start_date=start, end_date=start + timedelta(days=30)))
+                    counts["budgets"] += 1
+        counts["accounts"] = sum(len(ids) for ids in account_ids.values())
+        counts["categories"] = sum(len(cats) for cats in categories.values())
+
+        # Merchant mappings: statement titles seen before, with amounts
+        mapping_rows = []
+        for user_id in user_ids:
+            for category_id, name, _, amount, _ in categories[user_id]:
+                for merchant in MERCHANTS[name]:
+                    for _ in range(max(1, transactions // 2000)):
+                        title = statement_title(rng, merchant)
+                        mapping_rows.append(dict(
+                            user_id=user_id, amount=float(round(rng.lognormal(np.log(amount), 0.6))),
+                            statement_title=title, clean_title=main.clean_upi_title(title),
+                            mapped_title=merchant, merchant=merchant, category_id=category_id,
+                            created_at=now))
+        db.execute(insert(main.MerchantMapping.__table__), mapping_rows)
+        counts["merchant_mappings"] = len(mapping_rows)
+
+        for user_index, user_id in enumerate(user_ids):
+            n = transactions // users + (1 if user_index < transactions % users else 0)
+            if n == 0:
+                continue
+            cats = categories[user_id]
+            shares = np.array([c[2] for c in cats])
+            picks = rng.choice(len(cats), size=n, p=shares / shares.sum())
+            typical = np.array([c[3] for c in cats])[picks]
+            merchant_lists = [MERCHANTS[c[1]] for c in cats]
+            titles = np.array([merchant_lists[p][i % len(merchant_lists[p])]
+                               for p, i in zip(picks, rng.integers(0, 1000, size=n))], dtype=object)
+            notes = np.where(rng.random(n) < 0.3, "note " + pd.Series(np.arange(n)).astype(str), None)
+            dates = now - pd.to_timedelta(rng.integers(0, HISTORY_DAYS * 24 * 60, size=n), unit="m")
+            rows = pd.DataFrame({
+                'user_id': user_id,
+                'account_id': np.array(account_ids[user_id])[rng.integers(0, len(ACCOUNTS), size=n)],
+                'category_id': np.array([c[0] for c in cats])[picks],
+                'amount': np.round(rng.lognormal(np.log(typical), 0.6)),
+                'currency': "INR",
+                'title': titles,
+                'note': notes,
+                'date': dates,
+                'is_income': np.array([c[4] == "income" for c in cats])[picks],
+                'merchant': titles,
+                'created_at': now,
+                'updated_at': now
+            }).sort_values('date', kind='stable')
+            for start in range(0, n, main.IMPORT_BATCH_SIZE):
+                batch = rows.iloc[start:start + main.IMPORT_BATCH_SIZE]
+                db.execute(insert(main.Transaction.__table__), batch.to_dict('records'))
+            counts["transactions"] += n
+        db.commit()
+
+        main.rebuild_monthly_rollups(db)
+        main.verify_account_balances(db, rebuild=True)
+    finally:
+        db.close()
+    return counts
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", required=True, help="SQLite file to create")
+    parser.add_argument("--transactions", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if os.path.exists(args.output):
+        sys.exit(f"{args.output} already exists")
+    # main binds its engine to DATABASE_URL when imported
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(args.output)}"
+    sys.path.insert(0, BACKEND_DIR)
+    import main
+
+    counts = generate(main, args.transactions, args.users, args.seed)
+    print("✓ Generated " + ", ".join(f"{count} {name}" for name, count in counts.items()))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -3,6 +3,7 @@
 import pandas as pd
 import sqlite3
 from datetime import datetime
+from merchant_mapping_key import MAPPING_KEY, ensure_mapping_key
 
 def load_merchant_mappings():
     """Load merchant mappings from input.csv into the database"""
@@ -15,27 +16,35 @@ def load_merchant_mappings():
         
         # Connect to database
         conn = sqlite3.connect('./finance_tracker.db')
+        ensure_mapping_key(conn)
         cursor = conn.cursor()
         
-        # Insert mappings
-        count = 0
+        # Insert mappings; keys that already have a mapping are left alone
+        now = datetime.utcnow().isoformat()
+        rows = []
         for _, row in df.iterrows():
             amount = float(row['amount']) if pd.notna(row['amount']) else 0
             statement_title = str(row['title']).strip() if pd.notna(row['title']) else ''
             mapped_title = str(row['title']).strip() if pd.notna(row['title']) else ''
             
             if amount > 0 and statement_title:
-                cursor.execute("""
-                    INSERT INTO merchant_mappings 
-                    (user_id, amount, statement_title, clean_title, mapped_title, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (1, amount, statement_title, statement_title, mapped_title, datetime.utcnow().isoformat()))
-                count += 1
+                rows.append((1, amount, statement_title, statement_title, mapped_title, 'csv', now))
+        
+        changes = conn.total_changes
+        cursor.executemany(f"""
+            INSERT INTO merchant_mappings 
+            (user_id, amount, statement_title, clean_title, mapped_title, source, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT ({MAPPING_KEY}) DO NOTHING
+        """, rows)
+        count = conn.total_changes - changes
         
         conn.commit()
         conn.close()
         
         print(f"✓ Successfully loaded {count} merchant mappings into the database!")
+        if count < len(rows):
+            print(f"  ({len(rows) - count} already had a mapping)")
         return True
         
     except Exception as e:
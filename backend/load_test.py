@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""
+Load test: latency of GET /api/transactions while a large CSV import runs.
+
+Starts uvicorn on a scratch database, seeds it, then measures list-page
+latency from several client threads, first on an idle server and then
+while POST /api/import/csv processes a large file.
+
+Usage: python load_test.py [--seed-rows 50000] [--import-rows 500000] [--clients 8]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+import httpx
+
+from benchmark_import import write_statement_csv
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def wait_for_server(base_url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"{base_url}/api/categories", timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+def import_csv(base_url, csv_path):
+    with open(csv_path, "rb") as f:
+        response = httpx.post(f"{base_url}/api/import/csv",
+                              files={"file": ("statement.csv", f, "text/csv")},
+                              timeout=None)
+    response.raise_for_status()
+
+
+def client(base_url, stop, latencies):
+    with httpx.Client(timeout=60) as http:
+        while not stop.is_set():
+            # A unique parameter keeps the response cache out of the measurement
+            started = time.perf_counter()
+            http.get(f"{base_url}/api/transactions",
+                     params={"limit": 50, "nocache": uuid.uuid4().hex}).raise_for_status()
+            latencies.append(time.perf_counter() - started)
+
+
+def measure(base_url, clients, until):
+    """Run client threads until until() returns; latencies in seconds"""
+    latencies = []
+    stop = threading.Event()
+    threads = [threading.Thread(target=client, args=(base_url, stop, latencies))
+               for _ in range(clients)]
+    for t in threads:
+        t.start()
+    until()
+    stop.set()
+    for t in threads:
+        t.join()
+    return sorted(latencies)
+
+
+def percentile(values, p):
+    return values[min(len(values) - 1, int(len(values) * p / 100))] * 1000
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seed-rows", type=int, default=50000)
+    parser.add_argument("--import-rows", type=int, default=500000)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--idle-seconds", type=float, default=10)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--backend-dir", default=BACKEND_DIR,
+                        help="backend to test, e.g. a checkout of an older commit")
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    with tempfile.TemporaryDirectory() as workdir:
+        seed_csv = os.path.join(workdir, "seed.csv")
+        import_csv_path = os.path.join(workdir, "import.csv")
+        write_statement_csv(seed_csv, args.seed_rows, seed=1)
+        write_statement_csv(import_csv_path, args.import_rows, seed=2)
+
+        # main opens ./finance_tracker.db, so run the server in the scratch dir
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port),
+             "--log-level", "warning"],
+            cwd=workdir, env={**os.environ, "PYTHONPATH": args.backend_dir})
+        try:
+            wait_for_server(base_url)
+            import_csv(base_url, seed_csv)
+
+            idle = measure(base_url, args.clients,
+                           lambda: time.sleep(args.idle_seconds))
+            started = time.perf_counter()
+            loaded = measure(base_url, args.clients,
+                             lambda: import_csv(base_url, import_csv_path))
+            import_seconds = time.perf_counter() - started
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"{'phase':>14} {'requests':>9} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for name, latencies in (("idle", idle), ("during import", loaded)):
+        print(f"{name:>14} {len(latencies):>9} {percentile(latencies, 50):>9.1f} "
+              f"{percentile(latencies, 99):>9.1f} {latencies[-1] * 1000:>9.1f}")
+    print(f"import of {args.import_rows} rows took {import_seconds:.1f}s")
+
+
+if __name__ == "__main__":
+    main_cli()
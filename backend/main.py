@@ -1,18 +1,137 @@
-from fastapi import FastAPI, HTTPException, Depends, UploadFile, File
+from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, DateTime, ForeignKey, func, extract
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.routing import Match
+from sqlalchemy import create_engine, event, inspect, text, Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Index, and_, or_, case, func, extract, insert, literal, select, tuple_, type_coerce, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import OperationalError, ProgrammingError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session, relationship
+from sqlalchemy.sql import table, column, literal_column
 from pydantic import BaseModel
 from datetime import datetime, timedelta
 from typing import List, Optional
 import pandas as pd
-from io import StringIO
+from io import BytesIO, StringIO
+from merchant_mapping_key import (COMPACT_STATEMENTS, MAPPING_GENERATION_SQL, MAPPING_KEY, MAPPING_KEY_INDEX,
+                                  MAPPING_KEY_MATCH, ensure_mapping_key)
+from statement_parsers import detect_statement_format, get_statement_format, parse_statement, read_statement_rows
+import anyio
+import base64
+import csv
+import hashlib
 import json
+import os
+import shutil
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+import warnings
+import zipfile
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from concurrent.futures import ThreadPoolExecutor
+
+# Columnar export (/api/export) is available when pyarrow is installed
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+# Per-request SQL statistics for the performance metrics
+
+class RequestStats:
+    __slots__ = ("queries", "sql_seconds", "rows")
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.rows = 0
+
+
+_request_stats = ContextVar("request_stats", default=None)
+
+
+class CountingCursor(sqlite3.Cursor):
+    """sqlite3 reports no rowcount for SELECT, so count rows as they are fetched"""
+
+    def _count(self, rows):
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.rows += len(rows)
+        return rows
+
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None:
+            self._count((row,))
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        return self._count(super().fetchmany(*args, **kwargs))
+
+    def fetchall(self):
+        return self._count(super().fetchall())
+
+
+class CountingConnection(sqlite3.Connection):
+    def cursor(self, factory=CountingCursor):
+        return super().cursor(factory)
+
 
 # Database setup
-DATABASE_URL = "sqlite:///./finance_tracker.db"
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite:///./finance_tracker.db")
+
+# "tuned" applies SQLITE_PRAGMAS to every new connection; "default" leaves
+# SQLite's own settings (rollback journal, full fsync on every commit)
+DATABASE_PROFILE = os.environ.get("DATABASE_PROFILE", "tuned")
+DATABASE_POOL_SIZE = int(os.environ.get("DATABASE_POOL_SIZE", "10"))
+DATABASE_MAX_OVERFLOW = int(os.environ.get("DATABASE_MAX_OVERFLOW", "20"))
+
+# Endpoints are plain def functions, so FastAPI runs them in anyio's worker
+# threads and the event loop stays free. Capped at the connection pool size
+# so a burst of requests queues for a thread rather than for a connection.
+API_THREADPOOL_SIZE = int(os.environ.get(
+    "API_THREADPOOL_SIZE", DATABASE_POOL_SIZE + DATABASE_MAX_OVERFLOW))
+
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",      # readers no longer block behind the writer
+    "synchronous": "NORMAL",    # fsync at checkpoints, not on every commit
+    "mmap_size": 268435456,     # 256 MB
+    "cache_size": -65536,       # 64 MB (negative means KiB)
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,       # ms to wait for the write lock
+}
+
+
+def create_db_engine(url: str = DATABASE_URL, profile: str = DATABASE_PROFILE):
+    """Engine for url; SQLite connections get SQLITE_PRAGMAS under the
+    tuned profile, other databases get a pre-pinged connection pool"""
+    if not url.startswith("sqlite"):
+        return create_engine(url, pool_size=DATABASE_POOL_SIZE,
+                             max_overflow=DATABASE_MAX_OVERFLOW, pool_pre_ping=True)
+
+    # CountingConnection lets the metrics hooks count rows read by SELECTs
+    db_engine = create_engine(url, connect_args={"check_same_thread": False,
+                                                 "factory": CountingConnection},
+                              pool_size=DATABASE_POOL_SIZE,
+                              max_overflow=DATABASE_MAX_OVERFLOW)
+    if profile == "tuned":
+        @event.listens_for(db_engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in SQLITE_PRAGMAS.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+    return db_engine
+
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -78,6 +197,13 @@ class Transaction(Base):
     account = relationship("Account", back_populates="transactions")
     category = relationship("Category", back_populates="transactions")
 
+    __table_args__ = (
+        # Backs the date-ordered listing and keyset pagination
+        Index("ix_transactions_user_date_id", "user_id", "date", "id"),
+        # Backs the per-category date windows of budget evaluation
+        Index("ix_transactions_user_category_date", "user_id", "category_id", "date"),
+    )
+
 
 class Budget(Base):
     __tablename__ = "budgets"
@@ -103,11 +229,200 @@ class MerchantMapping(Base):
     merchant = Column(String, nullable=True)
     category_id = Column(Integer, ForeignKey("categories.id"),
                          nullable=True)  # Category ID from database
+    # Who wrote it: 'statement' (create_smart_mappings.py), 'csv' (input.csv)
+    # or 'manual'; NULL on rows from before it was recorded
+    source = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class StatementFile(Base):
+    """Statement files create_smart_mappings.py has matched, by content hash"""
+    __tablename__ = "statement_files"
+    file_name = Column(String, primary_key=True)
+    sha256 = Column(String)
+    lines = Column(Integer, default=0)
+    processed_at = Column(DateTime, default=datetime.utcnow)
+
+
+class MonthlyRollup(Base):
+    """Per-month sums of transactions, kept current by every write path"""
+    __tablename__ = "monthly_rollups"
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    year_month = Column(String, primary_key=True)  # YYYY-MM
+    category_id = Column(Integer, primary_key=True)  # 0 when unset
+    account_id = Column(Integer, primary_key=True)  # 0 when unset
+    is_income = Column(Boolean, primary_key=True)
+    total = Column(Float, default=0.0)
+    count = Column(Integer, default=0)
+
+
+class AccountBalance(Base):
+    """Net of an account's transactions (income minus expenses), kept
+    current by every write path"""
+    __tablename__ = "account_balances"
+    account_id = Column(Integer, ForeignKey("accounts.id"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    balance = Column(Float, default=0.0)
+
+
+class DataVersion(Base):
+    """Generation of a user's data, bumped in the same transaction as every
+    write; cached responses and results are keyed by it, so all worker
+    processes see a write at once"""
+    __tablename__ = "data_versions"
+    user_id = Column(Integer, primary_key=True)
+    version = Column(Integer, default=0)
+
+
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    kind = Column(String)  # csv or transactions
+    filename = Column(String, nullable=True)
+    file_path = Column(String)  # Copy of the submitted payload
+    status = Column(String, default="queued")  # queued, running, completed or failed
+    rows_parsed = Column(Integer, default=0)
+    rows_inserted = Column(Integer, default=0)
+    rows_mapped = Column(Integer, default=0)
+    rows_failed = Column(Integer, default=0)
+    error = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    # IMPORT_WORKER_ID of the process running the job, and when it last
+    # committed progress; a stale heartbeat lets another process take over
+    owner = Column(String, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+
+
+def lost_schema_race(error) -> bool:
+    """Whether a DDL error means another worker process booting at the same
+    time created the table, column or index first"""
+    message = str(error.orig).lower()
+    return "already exists" in message or "duplicate column" in message
+
+
+def run_schema_step(step, attempts=3):
+    """Run a DDL step, repeating it if another worker won a race; the checks
+    inside the step then see what that worker created"""
+    for attempt in range(attempts):
+        try:
+            return step()
+        except (OperationalError, ProgrammingError) as e:
+            if not lost_schema_race(e) or attempt == attempts - 1:
+                raise
+
+
+def add_missing_columns_and_indexes(db_table):
+    existing_columns = {c["name"] for c in inspect(engine).get_columns(db_table.name)}
+    for db_column in db_table.columns:
+        if db_column.name not in existing_columns:
+            with engine.begin() as conn:
+                conn.execute(text(
+                    f"ALTER TABLE {db_table.name} ADD COLUMN {db_column.name} "
+                    f"{db_column.type.compile(dialect=engine.dialect)}"))
+    with warnings.catch_warnings():
+        # The check reflects indexes and SQLAlchemy cannot reflect the
+        # expression index on merchant_mappings' key
+        warnings.filterwarnings("ignore", "Skipped unsupported reflection")
+        for index in db_table.indexes:
+            index.create(bind=engine, checkfirst=True)
 
 
 # Create tables
-Base.metadata.create_all(bind=engine)
+run_schema_step(lambda: Base.metadata.create_all(bind=engine))
+
+# create_all() skips columns and indexes on tables that already exist, so
+# add any new ones to older databases here. New columns must be nullable.
+for db_table in Base.metadata.sorted_tables:
+    run_schema_step(lambda: add_missing_columns_and_indexes(db_table))
+
+# Full-text search over transaction title/note/merchant. The trigram
+# tokenizer matches case-insensitive substrings, same as the old ILIKE
+# search, and triggers keep it in sync with every write to transactions.
+transactions_fts = table("transactions_fts", column("rowid"), column("rank"))
+
+TRANSACTIONS_FTS_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS transactions_fts_ai AFTER INSERT ON transactions BEGIN
+        INSERT INTO transactions_fts(rowid, title, note, merchant)
+        VALUES (new.id, new.title, new.note, new.merchant);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS transactions_fts_ad AFTER DELETE ON transactions BEGIN
+        INSERT INTO transactions_fts(transactions_fts, rowid, title, note, merchant)
+        VALUES ('delete', old.id, old.title, old.note, old.merchant);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS transactions_fts_au AFTER UPDATE OF title, note, merchant ON transactions BEGIN
+        INSERT INTO transactions_fts(transactions_fts, rowid, title, note, merchant)
+        VALUES ('delete', old.id, old.title, old.note, old.merchant);
+        INSERT INTO transactions_fts(rowid, title, note, merchant)
+        VALUES (new.id, new.title, new.note, new.merchant);
+    END""",
+]
+
+
+def setup_transaction_search(bind=engine) -> bool:
+    """Create the FTS5 index and its triggers; False if FTS5 is unavailable"""
+    if bind.dialect.name != "sqlite":
+        return False
+    try:
+        with bind.begin() as conn:
+            exists = conn.exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE name = 'transactions_fts'"
+            ).first()
+            if not exists:
+                conn.exec_driver_sql(
+                    "CREATE VIRTUAL TABLE transactions_fts USING fts5("
+                    "title, note, merchant, content='transactions', "
+                    "content_rowid='id', tokenize='trigram')")
+                conn.exec_driver_sql(
+                    "INSERT INTO transactions_fts(transactions_fts) VALUES ('rebuild')")
+            for trigger in TRANSACTIONS_FTS_TRIGGERS:
+                conn.exec_driver_sql(trigger)
+        return True
+    except OperationalError as e:
+        print(f"Full-text search unavailable, using LIKE search: {e}")
+        return False
+
+
+FTS_ENABLED = setup_transaction_search()
+
+
+def compact_mapping_key_postgres(bind) -> int:
+    """ensure_mapping_key for PostgreSQL, without the SQLite-only version
+    triggers; an advisory lock keeps workers from compacting at once"""
+    count = text("SELECT COUNT(*) FROM merchant_mappings")
+    with bind.begin() as conn:
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:name))"),
+                     {"name": MAPPING_KEY_INDEX})
+        if conn.execute(text("SELECT 1 FROM pg_indexes WHERE indexname = :name"),
+                        {"name": MAPPING_KEY_INDEX}).first():
+            return 0
+        before = conn.execute(count).scalar()
+        for statement in COMPACT_STATEMENTS:
+            conn.execute(text(statement))
+        return before - conn.execute(count).scalar()
+
+
+def setup_merchant_mapping_key(bind=engine) -> int:
+    """Merge duplicate merchant mappings and add the unique key they are
+    upserted under (merchant_mapping_key.py); returns rows merged away"""
+    if bind.dialect.name == "postgresql":
+        removed = compact_mapping_key_postgres(bind)
+    elif bind.dialect.name == "sqlite":
+        conn = bind.raw_connection()
+        try:
+            removed = ensure_mapping_key(conn)
+        finally:
+            conn.close()
+    else:
+        return 0
+    if removed:
+        print(f"Merged {removed} duplicate merchant mappings")
+    return removed
+
+
+setup_merchant_mapping_key()
 
 # Pydantic Models
 
@@ -166,6 +481,76 @@ class BudgetCreate(BaseModel):
 # FastAPI app
 app = FastAPI(title="Finance Tracker API")
 
+# Response cache for the read endpoints the pages fetch on every mount.
+# Registered before CORS so CORS stays the outer layer and 304s carry its
+# headers too.
+
+RESPONSE_CACHE_PATHS = {
+    "/api/accounts",
+    "/api/categories",
+    "/api/transactions",
+    "/api/budgets",
+    "/api/analytics/overview",
+    "/api/analytics/category-breakdown",
+    "/api/analytics/monthly-trend",
+    "/api/analytics/account-distribution",
+    "/api/analytics/top-merchants",
+}
+RESPONSE_CACHE_SIZE = 256
+_response_cache = OrderedDict()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison, as If-None-Match requires"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag
+               for tag in if_none_match.split(","))
+
+
+@app.middleware("http")
+async def cache_responses(request: Request, call_next):
+    """Serve repeated GETs from memory with a strong ETag.
+
+    Entries are keyed by path, query parameters and the user's data
+    version, so any write makes them unreachable. The month is part of the
+    key as well because some responses are relative to the current month.
+    A matching If-None-Match is answered with 304 without running the
+    endpoint at all.
+    """
+    if request.method != "GET" or request.url.path not in RESPONSE_CACHE_PATHS:
+        return await call_next(request)
+
+    # One primary-key read, off the event loop
+    version = await run_in_threadpool(read_data_version, 1)
+    key = (request.url.path, tuple(sorted(request.query_params.multi_items())),
+           version, datetime.now().strftime('%Y-%m'))
+    entry = _response_cache.get(key)
+    if entry is None:
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        headers = {name: value for name, value in response.headers.items()
+                   if name != "content-length"}
+        headers["ETag"] = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        headers["Cache-Control"] = "no-cache"
+        entry = (body, headers)
+        _response_cache[key] = entry
+        while len(_response_cache) > RESPONSE_CACHE_SIZE:
+            _response_cache.popitem(last=False)
+    else:
+        _response_cache.move_to_end(key)
+
+    body, headers = entry
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers={
+            "ETag": headers["ETag"], "Cache-Control": headers["Cache-Control"]})
+    return Response(content=body, status_code=200, headers=headers)
+
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -173,8 +558,180 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+# Performance metrics
+#
+# Every request gets a RequestStats (defined with the database setup) in a
+# context variable; the cursor hooks below add each SQL statement's count,
+# time and rows to it, and the middleware folds it into per-route totals
+# served at /metrics.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# Statements slower than this many milliseconds are logged with their
+# parameters and query plan; unset to disable
+SLOW_QUERY_MS = os.environ.get("SLOW_QUERY_MS")
+SLOW_QUERY_MS = float(SLOW_QUERY_MS) if SLOW_QUERY_MS else None
+slow_queries = deque(maxlen=100)
+
+
+class RouteMetrics:
+    """Per-route request and SQL totals, rendered in Prometheus text format"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def observe(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        with self._lock:
+            entry = self._routes.get((method, route))
+            if entry is None:
+                entry = self._routes[(method, route)] = {
+                    "statuses": {}, "latency": [0] * len(LATENCY_BUCKETS), "seconds": 0.0,
+                    "query_counts": [0] * len(QUERY_COUNT_BUCKETS), "count": 0,
+                    "queries": 0, "sql_seconds": 0.0, "rows": 0}
+            entry["statuses"][status] = entry["statuses"].get(status, 0) + 1
+            entry["count"] += 1
+            entry["seconds"] += seconds
+            entry["queries"] += stats.queries
+            entry["sql_seconds"] += stats.sql_seconds
+            entry["rows"] += stats.rows
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    entry["latency"][i] += 1
+            for i, bound in enumerate(QUERY_COUNT_BUCKETS):
+                if stats.queries <= bound:
+                    entry["query_counts"][i] += 1
+
+    def render(self) -> str:
+        with self._lock:
+            routes = {key: {**entry, "statuses": dict(entry["statuses"]),
+                            "latency": list(entry["latency"]),
+                            "query_counts": list(entry["query_counts"])}
+                      for key, entry in sorted(self._routes.items())}
+
+        def histogram(lines, name, labels, buckets, counts, total, count):
+            for bound, value in zip(buckets, counts):
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {value}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f'{name}_sum{{{labels}}} {total}')
+            lines.append(f'{name}_count{{{labels}}} {count}')
+
+        lines = [
+            "# HELP http_requests_total Requests handled, by route and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route), e in routes.items():
+            for status, value in sorted(e["statuses"].items()):
+                lines.append(f'http_requests_total{{method="{method}",route="{route}",status="{status}"}} {value}')
+        lines += ["# HELP http_request_duration_seconds Request latency.",
+                  "# TYPE http_request_duration_seconds histogram"]
+        for (method, route), e in routes.items():
+            histogram(lines, "http_request_duration_seconds", f'method="{method}",route="{route}"',
+                      LATENCY_BUCKETS, e["latency"], e["seconds"], e["count"])
+        lines += ["# HELP http_request_sql_queries SQL statements issued per request.",
+                  "# TYPE http_request_sql_queries histogram"]
+        for (method, route), e in routes.items():
+            histogram(lines, "http_request_sql_queries", f'method="{method}",route="{route}"',
+                      QUERY_COUNT_BUCKETS, e["query_counts"], e["queries"], e["count"])
+        for name, key, help_text in (
+            ("http_request_sql_seconds_total", "sql_seconds", "Time spent executing SQL."),
+            ("http_request_sql_rows_total", "rows", "Rows returned or affected by SQL."),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for (method, route), e in routes.items():
+                lines.append(f'{name}{{method="{method}",route="{route}"}} {e[key]}')
+        return "\n".join(lines) + "\n"
+
+
+route_metrics = RouteMetrics()
+
+
+def route_template(scope) -> str:
+    """The matched route's path template, so ids don't explode the labels"""
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+@app.middleware("http")
+async def record_metrics(request: Request, call_next):
+    """Time the request and collect the SQL it issued. Registered after
+    CORS, so it is the outermost layer and cached responses count too."""
+    stats = RequestStats()
+    token = _request_stats.set(stats)
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        _request_stats.reset(token)
+        route_metrics.observe(request.method, route_template(request.scope), status,
+                              time.perf_counter() - started, stats)
+
+
+def explain_query(cursor, statement, parameters) -> List[str]:
+    """Query plan for a statement, run on a fresh cursor of the same connection"""
+    if isinstance(parameters, list):  # executemany
+        parameters = parameters[0] if parameters else ()
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    try:
+        plan_cursor = cursor.connection.cursor()
+        plan_cursor.execute(prefix + statement, parameters or ())
+        plan = [" ".join(str(v) for v in row) for row in plan_cursor.fetchall()]
+        plan_cursor.close()
+        return plan
+    except Exception as e:
+        return [f"unavailable: {e}"]
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def record_query(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.sql_seconds += elapsed
+        if cursor.rowcount > 0:
+            stats.rows += cursor.rowcount
+
+    if SLOW_QUERY_MS is not None and elapsed * 1000 >= SLOW_QUERY_MS:
+        entry = {
+            "at": datetime.utcnow().isoformat(),
+            "ms": round(elapsed * 1000, 2),
+            "statement": statement,
+            "parameters": repr(parameters)[:1000],
+            "plan": explain_query(cursor, statement, parameters),
+        }
+        slow_queries.append(entry)
+        print(f"Slow query ({entry['ms']} ms): {statement}\n"
+              f"  parameters: {entry['parameters']}\n"
+              + "".join(f"  plan: {line}\n" for line in entry["plan"]))
+
+
+@app.get("/metrics")
+def get_metrics():
+    return Response(content=route_metrics.render(),
+                    media_type="text/plain; version=0.0.4")
+
+
+@app.get("/metrics/slow-queries")
+def get_slow_queries():
+    """The most recent slow queries, newest first (needs SLOW_QUERY_MS)"""
+    return {"threshold_ms": SLOW_QUERY_MS, "queries": list(reversed(slow_queries))}
+
 # Dependency
 
 
@@ -202,97 +759,606 @@ def clean_upi_title(title: str) -> str:
     return title
 
 
+INPUT_CSV_PATH = "../input_data/input.csv"
+# Parsed input.csv kept next to the database so a cold start can skip pandas
+# (JSON, so a tampered file is only bad data, never code that runs)
+REFERENCE_SNAPSHOT_PATH = "./merchant_reference.json"
+
+_reference_lock = threading.Lock()
+_reference_cache = {"stat": None, "digest": None, "mappings": {}}
+
+
+def parse_merchant_reference(csv_file):
+    """Build the merchant mapping reference with category from input.csv"""
+    df = pd.read_csv(csv_file)
+
+    amounts = df['amount'].astype(float).fillna(0)
+    titles = df['title'].where(df['title'].notna(), '').astype(str).str.strip()
+    if 'category name' in df:
+        categories = df['category name'].map(lambda c: str(c).strip() if pd.notna(c) else None)
+    else:
+        categories = pd.Series([None] * len(df), index=df.index, dtype=object)
+
+    keep = (amounts > 0) & (titles != '')
+    # Keyed by amount + cleaned title; later rows win, as in a dict update
+    keys = amounts[keep].astype(str) + '_' + titles[keep].str.lower()
+    return {key: {'title': title, 'category': category}
+            for key, title, category in zip(keys, titles[keep], categories[keep])}
+
+
+def read_reference_snapshot(digest: str):
+    """Return the snapshot mappings if they were parsed from this digest"""
+    try:
+        with open(REFERENCE_SNAPSHOT_PATH, encoding='utf-8') as f:
+            snapshot = json.load(f)
+        if snapshot.get('digest') == digest and isinstance(snapshot.get('mappings'), dict):
+            return snapshot['mappings']
+    except Exception:
+        pass
+    return None
+
+
+def write_reference_snapshot(digest: str, mappings: dict):
+    try:
+        tmp_path = REFERENCE_SNAPSHOT_PATH + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'digest': digest, 'mappings': mappings}, f, ensure_ascii=False)
+        os.replace(tmp_path, REFERENCE_SNAPSHOT_PATH)
+    except Exception as e:
+        print(f"Error writing merchant reference snapshot: {e}")
+
+
 def load_merchant_mappings_from_csv():
-    """Load input.csv and create merchant mapping reference with category"""
+    """Load input.csv and create merchant mapping reference with category.
+
+    The parsed reference is cached in memory and only rebuilt when the
+    file's mtime or size changes and its SHA-256 differs from the cached
+    copy. The returned dict is shared, so callers must not modify it.
+    """
     try:
-        csv_path = "../input_data/input.csv"
-        df = pd.read_csv(csv_path)
-        mappings = {}
-
-        for _, row in df.iterrows():
-            # Create a key based on amount and title for matching
-            amount = float(row['amount']) if pd.notna(row['amount']) else 0
-            title = str(row['title']).strip() if pd.notna(row['title']) else ''
-            category = str(row['category name']).strip() if pd.notna(
-                row.get('category name')) else None
-
-            if amount > 0 and title:
-                # Store mapping by amount + cleaned title
-                key = f"{amount}_{title.lower()}"
-                mappings[key] = {
-                    'title': title,
-                    'category': category
-                }
-
-        return mappings
+        with _reference_lock:
+            st = os.stat(INPUT_CSV_PATH)
+            stat_key = (st.st_mtime_ns, st.st_size)
+            if _reference_cache['stat'] == stat_key:
+                return _reference_cache['mappings']
+
+            with open(INPUT_CSV_PATH, 'rb') as f:
+                contents = f.read()
+            digest = hashlib.sha256(contents).hexdigest()
+
+            if digest != _reference_cache['digest']:
+                mappings = read_reference_snapshot(digest)
+                if mappings is None:
+                    mappings = parse_merchant_reference(BytesIO(contents))
+                    write_reference_snapshot(digest, mappings)
+                _reference_cache['digest'] = digest
+                _reference_cache['mappings'] = mappings
+
+            _reference_cache['stat'] = stat_key
+            return _reference_cache['mappings']
     except Exception as e:
         print(f"Error loading merchant mappings: {e}")
         return {}
 
 
-def find_merchant_title(amount: float, statement_title: str, db: Session, user_id: int = 1) -> str:
-    """Find better title from merchant_mappings table or input.csv"""
+class MerchantMappingIndex:
+    """In-memory merchant mapping lookup keyed by (user_id, paise, title).
+
+    Every mapping is indexed under its statement_title, clean_title and
+    mapped_title (stripped and lower-cased), so a lookup is a couple of dict
+    probes instead of a scan of merchant_mappings. The table is read lazily
+    on first use; writers keep the index current through add(), or call
+    invalidate() after bulk changes so the next lookup reloads it.
+
+    Other workers and scripts write the table too, so batches call refresh()
+    first, which reads the table's generation (merchant_mapping_key.py):
+    rows above the highest loaded id are read in, and an update or delete
+    reloads everything.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = None
+        self._generation = None
+        self._max_id = 0
+        self._seq = 0
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+
+    @staticmethod
+    def _key(user_id, amount, title):
+        return (user_id, round(amount * 100), (title or '').strip().lower())
+
+    def _add_locked(self, user_id, amount, statement_title, clean_title, mapped_title):
+        # The oldest mapping wins, so existing keys are never overwritten
+        self._seq += 1
+        entry = (self._seq, mapped_title)
+        for title in {statement_title, clean_title, mapped_title}:
+            if title:
+                self._entries.setdefault(
+                    self._key(user_id, amount, title), entry)
+
+    @staticmethod
+    def _read_generation(db: Session):
+        """(update/delete count, max id) of merchant_mappings"""
+        if db.get_bind().dialect.name == "sqlite":
+            return tuple(db.execute(text(MAPPING_GENERATION_SQL)).one())
+        # No version triggers outside SQLite: only new rows are noticed
+        return 0, db.query(func.max(MerchantMapping.id)).scalar()
+
+    def _ensure_loaded(self, db: Session) -> dict:
+        entries = self._entries
+        return entries if entries is not None else self.refresh(db)
+
+    def refresh(self, db: Session) -> dict:
+        """Catch up with writes from other processes; one generation read"""
+        version, max_id = self._read_generation(db)
+        with self._lock:
+            if self._entries is not None and version == self._generation:
+                if (max_id or 0) > self._max_id:
+                    self._load_locked(db, MerchantMapping.id > self._max_id)
+                    self._max_id = max(self._max_id, max_id)
+                return self._entries
+            self._entries = {}
+            self._max_id = 0
+            self._generation = version
+            self._load_locked(db)
+            self._max_id = max(self._max_id, max_id or 0)
+            self.loads += 1
+            return self._entries
+
+    def _load_locked(self, db: Session, *criteria):
+        rows = db.query(
+            MerchantMapping.id,
+            MerchantMapping.user_id,
+            MerchantMapping.amount,
+            MerchantMapping.statement_title,
+            MerchantMapping.clean_title,
+            MerchantMapping.mapped_title
+        ).filter(MerchantMapping.amount.isnot(None), *criteria).order_by(MerchantMapping.id)
+        for row_id, *row in rows:
+            self._add_locked(*row)
+            self._max_id = max(self._max_id, row_id)
+
+    def lookup(self, db: Session, user_id: int, amount: float, statement_title: str, clean_title: str) -> Optional[str]:
+        """Return the mapped title for a statement line, or None"""
+        # Keep a reference: another thread may invalidate() meanwhile
+        entries = self._ensure_loaded(db)
+        hits = [hit for hit in (
+            entries.get(self._key(user_id, amount, statement_title)),
+            entries.get(self._key(user_id, amount, clean_title))
+        ) if hit]
+        if hits:
+            self.hits += 1
+            return min(hits)[1]
+        self.misses += 1
+        return None
+
+    def add(self, user_id, amount, statement_title, clean_title, mapped_title):
+        """Record a mapping just written to the database"""
+        with self._lock:
+            if self._entries is not None and amount is not None:
+                self._add_locked(user_id, amount, statement_title,
+                                 clean_title, mapped_title)
+
+    def invalidate(self):
+        with self._lock:
+            self._entries = None
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        entries = self._entries
+        return {
+            "entries": len(entries) if entries is not None else 0,
+            "loads": self.loads,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0
+        }
+
+
+merchant_index = MerchantMappingIndex()
+
+
+def find_merchant_titles(items, db: Session, user_id: int = 1) -> List[str]:
+    """Resolve better titles for many (amount, statement_title) pairs at once.
+
+    Existing mappings come from the in-memory merchant_index and input.csv
+    is read at most once. Mappings learned from input.csv are added to the
+    session but not committed, so callers can keep a whole batch in one
+    transaction.
+    """
+    titles = [statement_title for _, statement_title in items]
+    if not items:
+        return titles
+
     try:
-        # Clean UPI title if applicable
-        clean_title = clean_upi_title(statement_title)
-
-        # 1. Check database for existing mapping first (highest priority)
-        # Match by amount AND (statement_title OR clean_title OR mapped_title)
-        db_match = db.query(MerchantMapping).filter(
-            MerchantMapping.user_id == user_id,
-            abs(MerchantMapping.amount - amount) < 0.01
-        ).filter(
-            (MerchantMapping.statement_title == statement_title) |
-            (MerchantMapping.clean_title == clean_title) |
-            (MerchantMapping.mapped_title.ilike(clean_title))
-        ).first()
-
-        if db_match:
-            return db_match.mapped_title
+        # 1. Check existing mappings first (highest priority)
+        merchant_index.refresh(db)
+        misses = []
+        for i, (amount, statement_title) in enumerate(items):
+            mapped_title = merchant_index.lookup(
+                db, user_id, amount, statement_title, clean_upi_title(statement_title))
+            if mapped_title is not None:
+                titles[i] = mapped_title
+            else:
+                misses.append(i)
+
+        if not misses:
+            return titles
 
         # 2. If not in DB, check input.csv reference
         mappings = load_merchant_mappings_from_csv()
-        search_key = f"{amount}_{clean_title.lower()}"
-
-        if search_key in mappings:
-            mapping_data = mappings[search_key]
-            mapped_title = mapping_data['title']
-            category_name = mapping_data.get('category')
-
-            # Look up category_id from name
-            category_id = None
-            if category_name:
-                category = db.query(Category).filter(
-                    Category.name.ilike(category_name)
-                ).first()
-                if category:
-                    category_id = category.id
-
-            # Save this new mapping to database for next time
-            merchant_map = MerchantMapping(
-                user_id=user_id,
-                amount=amount,
-                statement_title=statement_title,
-                clean_title=clean_title,
-                mapped_title=mapped_title,
-                category_id=category_id
-            )
-            db.add(merchant_map)
-            db.commit()
-
-            return mapped_title
-
-        # Fallback: return statement title as is
-        return statement_title
+        category_ids = {}
+        for category_id, name in db.query(Category.id, Category.name).order_by(Category.id):
+            if name:
+                category_ids.setdefault(name.lower(), category_id)
+
+        learned = {}
+        for i in misses:
+            amount, statement_title = items[i]
+            clean_title = clean_upi_title(statement_title)
+            search_key = f"{amount}_{clean_title.lower()}"
+
+            if search_key in mappings:
+                mapping_data = mappings[search_key]
+                titles[i] = mapping_data['title']
+                category_name = mapping_data.get('category')
+
+                # Save this new mapping to database for next time
+                learned.setdefault((amount, statement_title), dict(
+                    user_id=user_id,
+                    amount=amount,
+                    statement_title=statement_title,
+                    clean_title=clean_title,
+                    mapped_title=mapping_data['title'],
+                    category_id=category_ids.get(category_name.lower())
+                    if category_name else None,
+                    source='csv',
+                    created_at=datetime.utcnow()
+                ))
+
+        if learned:
+            # Another request may have learned the same mapping meanwhile
+            db.execute(upsert_statement(db, MerchantMapping).on_conflict_do_nothing(),
+                       list(learned.values()))
+            for m in learned.values():
+                merchant_index.add(user_id, m['amount'], m['statement_title'],
+                                   m['clean_title'], m['mapped_title'])
+
+        # Fallback: misses not in input.csv keep their statement title
+        return titles
     except Exception as e:
-        print(f"Error finding merchant title: {e}")
-        return statement_title
+        print(f"Error finding merchant titles: {e}")
+        return [statement_title for _, statement_title in items]
+
+
+def find_merchant_title(amount: float, statement_title: str, db: Session, user_id: int = 1) -> str:
+    """Find better title from merchant_mappings table or input.csv"""
+    title = find_merchant_titles([(amount, statement_title)], db, user_id)[0]
+    db.commit()
+    return title
+
+
+# Helper functions for the monthly rollups
+
+def upsert_statement(db: Session, model):
+    """INSERT for the session's dialect, supporting on_conflict_do_update"""
+    dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+    return dialect.insert(model.__table__)
+
+
+def rollup_key(user_id, year_month, category_id, account_id, is_income):
+    return (user_id, year_month, category_id or 0, account_id or 0, bool(is_income))
+
+
+def add_rollup_delta(deltas: dict, user_id, date, category_id, account_id, is_income, amount, count=1):
+    """Accumulate one transaction into deltas; pass negative amount and
+    count to take it back out"""
+    if date is None:
+        return
+    key = rollup_key(user_id, date.strftime('%Y-%m'),
+                     category_id, account_id, is_income)
+    total, n = deltas.get(key, (0.0, 0))
+    deltas[key] = (total + (amount or 0.0), n + count)
+
+
+def apply_rollup_deltas(db: Session, deltas: dict):
+    """Fold accumulated deltas into monthly_rollups and account_balances
+    with one upsert batch each"""
+    if not deltas:
+        return
+    apply_balance_deltas(db, deltas)
+    stmt = upsert_statement(db, MonthlyRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "year_month", "category_id",
+                        "account_id", "is_income"],
+        set_={
+            "total": MonthlyRollup.total + stmt.excluded.total,
+            "count": MonthlyRollup.count + stmt.excluded.count
+        }
+    )
+    db.execute(stmt, [
+        dict(user_id=user_id, year_month=year_month, category_id=category_id,
+             account_id=account_id, is_income=is_income, total=total, count=count)
+        for (user_id, year_month, category_id, account_id, is_income), (total, count)
+        in deltas.items()
+    ])
+
+
+def rebuild_monthly_rollups(db: Session) -> int:
+    """Recompute monthly_rollups from transactions in one GROUP BY"""
+    year = extract('year', Transaction.date)
+    month = extract('month', Transaction.date)
+    category_id = func.coalesce(Transaction.category_id, 0)
+    account_id = func.coalesce(Transaction.account_id, 0)
+    is_income = func.coalesce(Transaction.is_income, False)
+    rows = db.query(
+        Transaction.user_id, year, month, category_id, account_id, is_income,
+        func.sum(Transaction.amount), func.count(Transaction.id)
+    ).filter(Transaction.date.isnot(None)).group_by(
+        Transaction.user_id, year, month, category_id, account_id, is_income
+    ).all()
+
+    db.query(MonthlyRollup).delete()
+    if rows:
+        db.execute(insert(MonthlyRollup.__table__), [
+            dict(user_id=user_id, year_month=f"{int(y)}-{int(m):02d}",
+                 category_id=cat_id, account_id=acc_id, is_income=bool(income),
+                 total=total or 0.0, count=count)
+            for user_id, y, m, cat_id, acc_id, income, total, count in rows
+        ])
+    # The database may have been edited by hand, so invalidate everyone
+    known = {user_id for (user_id,) in db.query(DataVersion.user_id)}
+    for user_id in {row[0] for row in rows} | known:
+        bump_data_version(db, user_id)
+    db.commit()
+    return len(rows)
+
+
+# Helper functions for account balances
+
+def signed_amount(amount, is_income):
+    return amount if is_income else -amount
+
+
+def apply_balance_deltas(db: Session, deltas: dict):
+    """Fold rollup deltas into account_balances, one row per account"""
+    balances = {}
+    for (user_id, _, _, account_id, is_income), (total, _) in deltas.items():
+        if account_id:
+            balances[(user_id, account_id)] = balances.get(
+                (user_id, account_id), 0.0) + signed_amount(total, is_income)
+    if not balances:
+        return
+    stmt = upsert_statement(db, AccountBalance)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["account_id"],
+        set_={"balance": AccountBalance.balance + stmt.excluded.balance}
+    )
+    db.execute(stmt, [
+        dict(user_id=user_id, account_id=account_id, balance=balance)
+        for (user_id, account_id), balance in balances.items()
+    ])
+
+
+def verify_account_balances(db: Session, rebuild: bool = False) -> dict:
+    """Recompute every balance in one GROUP BY and compare with the stored
+    ones; with rebuild, replace the stored balances with the computed ones"""
+    actual = {
+        account_id: (user_id, balance or 0.0)
+        for account_id, user_id, balance in db.query(
+            Account.id, Account.user_id,
+            func.sum(case((Transaction.is_income == True, Transaction.amount),
+                          else_=-Transaction.amount))
+        ).outerjoin(Transaction, Transaction.account_id == Account.id).group_by(Account.id)
+    }
+    stored = dict(db.query(AccountBalance.account_id, AccountBalance.balance))
+
+    drift = []
+    for account_id in sorted(actual.keys() | stored.keys()):
+        expected = actual.get(account_id, (None, 0.0))[1]
+        current = stored.get(account_id) or 0.0
+        if abs(expected - current) > 0.005:
+            drift.append({"account_id": account_id, "stored": current,
+                          "actual": expected, "difference": current - expected})
+
+    if rebuild:
+        db.query(AccountBalance).delete()
+        if actual:
+            db.execute(insert(AccountBalance.__table__), [
+                dict(account_id=account_id, user_id=user_id, balance=balance)
+                for account_id, (user_id, balance) in actual.items()
+            ])
+        for user_id in {user_id for user_id, _ in actual.values()}:
+            bump_data_version(db, user_id)
+        db.commit()
+
+    return {"accounts": len(actual), "drifted": len(drift),
+            "rebuilt": rebuild, "drift": drift}
+
+
+# Helper functions for cached analytics
+
+# The data_versions row of a user is bumped by every transaction that
+# changes their transactions, accounts, categories or budgets; cached
+# results and responses are only served while the version they were
+# computed at is current
+_overview_cache = {}
+
+
+def data_version(db, user_id: int) -> int:
+    """The user's current data version; db is a Session or Connection"""
+    row = db.execute(select(DataVersion.version).where(
+        DataVersion.user_id == user_id)).first()
+    return row[0] if row else 0
+
+
+def read_data_version(user_id: int) -> int:
+    with engine.connect() as conn:
+        return data_version(conn, user_id)
+
+
+def bump_data_version(db: Session, user_id: int):
+    """Call before committing a change to the user's data, so the new
+    version commits together with it"""
+    db.execute(upsert_statement(db, DataVersion).values(
+        user_id=user_id, version=1
+    ).on_conflict_do_update(index_elements=[DataVersion.user_id],
+                            set_={"version": DataVersion.version + 1}))
+
+
+def compute_overview(db: Session, user_id: int, start_of_month: datetime) -> dict:
+    """All overview figures from one scan using conditional aggregates"""
+    expense = Transaction.is_income == False
+    income = Transaction.is_income == True
+    this_month = Transaction.date >= start_of_month
+    row = db.query(
+        func.sum(case((expense, Transaction.amount), else_=0)),
+        func.sum(case((income, Transaction.amount), else_=0)),
+        func.sum(case((expense & this_month, Transaction.amount), else_=0)),
+        func.sum(case((income & this_month, Transaction.amount), else_=0)),
+        func.count(Transaction.id)
+    ).filter(Transaction.user_id == user_id).one()
+
+    total_expenses, total_income, month_expenses, month_income = (v or 0 for v in row[:4])
+    return {
+        "total_expenses": total_expenses,
+        "total_income": total_income,
+        "net_savings": total_income - total_expenses,
+        "month_expenses": month_expenses,
+        "month_income": month_income,
+        "month_net": month_income - month_expenses,
+        "total_transactions": row[4] or 0
+    }
+
+
+# Helper functions for transaction search
+
+def fts_phrase(search: str) -> Optional[str]:
+    """Quote a search term as an FTS5 phrase, or None if it is too short
+    for the trigram index (fewer than 3 characters)"""
+    term = search.strip()
+    if len(term) < 3:
+        return None
+    return '"' + term.replace('"', '""') + '"'
+
+
+# Helper functions for keyset pagination
+
+def transaction_date_key():
+    """Transaction.date as stored, without DateTime result processing.
+
+    Older SQLite rows hold plain 'YYYY-MM-DD' strings next to full
+    timestamps, so cursors compare against the raw column value to stay
+    consistent with the ORDER BY. Other databases store a real timestamp
+    and use the column itself.
+    """
+    if engine.dialect.name == "sqlite":
+        return type_coerce(Transaction.date, String)
+    return Transaction.date
+
+
+def encode_cursor(date_key, transaction_id: int) -> str:
+    """Build an opaque cursor pointing just past the given row"""
+    if isinstance(date_key, datetime):
+        date_key = date_key.isoformat()
+    payload = json.dumps([date_key, transaction_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    """Return the (date_key, id) pair stored in a cursor from encode_cursor,
+    with the date as a value comparable to transaction_date_key()"""
+    try:
+        date_key, transaction_id = json.loads(
+            base64.urlsafe_b64decode(cursor.encode()))
+        date_key = str(date_key)
+        if engine.dialect.name != "sqlite":
+            date_key = datetime.fromisoformat(date_key)
+        return date_key, int(transaction_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# Helper functions for transaction responses
+
+def query_transaction_rows(db: Session, *extra_columns):
+    """Select the TransactionResponse fields with account and category
+    names joined in, so serializing a page never lazy-loads relationships"""
+    return db.query(
+        Transaction.id,
+        Transaction.account_id,
+        Transaction.category_id,
+        Transaction.amount,
+        Transaction.currency,
+        Transaction.title,
+        Transaction.note,
+        Transaction.date,
+        Transaction.is_income,
+        Transaction.merchant,
+        Account.name.label('account_name'),
+        Category.name.label('category_name'),
+        Category.color.label('category_color'),
+        *extra_columns
+    ).select_from(Transaction).outerjoin(
+        Account, Transaction.account_id == Account.id
+    ).outerjoin(
+        Category, Transaction.category_id == Category.id
+    )
+
+
+def filter_transaction_rows(query, search=None, start_date=None, end_date=None,
+                            category_id=None, account_id=None, is_income=None):
+    """Apply the GET /api/transactions filters to a query_transaction_rows()
+    query. Returns the query and whether the full-text index matched the
+    search, in which case transactions_fts.c.rank is available."""
+    matched = False
+    phrase = fts_phrase(search) if search else None
+    if FTS_ENABLED and phrase:
+        query = query.join(
+            transactions_fts, transactions_fts.c.rowid == Transaction.id
+        ).filter(literal_column("transactions_fts").op("MATCH")(phrase))
+        matched = True
+    elif search:
+        query = query.filter(
+            (Transaction.title.ilike(f'%{search}%')) |
+            (Transaction.note.ilike(f'%{search}%')) |
+            (Transaction.merchant.ilike(f'%{search}%'))
+        )
+    if start_date:
+        query = query.filter(Transaction.date >=
+                             datetime.fromisoformat(start_date))
+    if end_date:
+        query = query.filter(Transaction.date <=
+                             datetime.fromisoformat(end_date))
+    if category_id:
+        query = query.filter(Transaction.category_id == category_id)
+    if account_id:
+        query = query.filter(Transaction.account_id == account_id)
+    if is_income is not None:
+        query = query.filter(Transaction.is_income == is_income)
+    return query, matched
+
+
+def transaction_response(row) -> TransactionResponse:
+    """Build a TransactionResponse from a query_transaction_rows() row"""
+    return TransactionResponse(**row._mapping)
+
+
+def get_transaction_response(db: Session, transaction_id: int) -> TransactionResponse:
+    row = query_transaction_rows(db).filter(
+        Transaction.id == transaction_id).first()
+    return transaction_response(row)
 
 # Initialize default user and data
 
 
 @app.on_event("startup")
 async def startup_event():
+    anyio.to_thread.current_default_thread_limiter().total_tokens = API_THREADPOOL_SIZE
+
     db = SessionLocal()
 
     # Check if default user exists
@@ -356,6 +1422,18 @@ async def startup_event():
 
         db.commit()
 
+    # Build the summary tables for databases created before they existed
+    if db.query(Transaction.id).first() is not None:
+        if db.query(MonthlyRollup).first() is None:
+            rebuild_monthly_rollups(db)
+        if db.query(AccountBalance).first() is None:
+            verify_account_balances(db, rebuild=True)
+
+    # Pick up import jobs that were queued or interrupted by a restart
+    for (job_id,) in db.query(ImportJob.id).filter(
+            ImportJob.status.in_(["queued", "running"])).order_by(ImportJob.id):
+        import_executor.submit(run_import_job, job_id)
+
     db.close()
 
 # API Endpoints
@@ -364,64 +1442,356 @@ async def startup_event():
 
 
 @app.get("/api/transactions", response_model=List[TransactionResponse])
-async def get_transactions(
+def get_transactions(
+    response: Response,
     skip: int = 0,
     limit: int = 1000,
+    cursor: Optional[str] = None,
     search: Optional[str] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     category_id: Optional[int] = None,
     account_id: Optional[int] = None,
     is_income: Optional[bool] = None,
+    order: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    query = db.query(Transaction).filter(Transaction.user_id == 1)
-
-    if search:
+    """List transactions, newest first.
+
+    Pages either by skip/limit or, when `cursor` is given, by seeking past
+    the (date, id) it encodes. A full page sets the X-Next-Cursor header
+    to the cursor for the following page. A skip/limit `search` served by
+    the full-text index is ordered by relevance instead and has no cursor;
+    pass order=date to page a search by date with cursors.
+    """
+    if order not in (None, "relevance", "date"):
+        raise HTTPException(status_code=400, detail="order must be relevance or date")
+
+    date_key = transaction_date_key()
+    query = query_transaction_rows(db, date_key.label('date_key')).filter(
+        Transaction.user_id == 1)
+
+    query, matched = filter_transaction_rows(
+        query, search, start_date, end_date, category_id, account_id, is_income)
+    ranked = matched and not cursor and order != "date"
+
+    if ranked:
+        query = query.order_by(transactions_fts.c.rank)
+    query = query.order_by(Transaction.date.desc(), Transaction.id.desc())
+    if cursor:
+        # Seek on the (user_id, date, id) index instead of counting off rows
+        cursor_date, cursor_id = decode_cursor(cursor)
         query = query.filter(
-            (Transaction.title.ilike(f'%{search}%')) |
-            (Transaction.note.ilike(f'%{search}%')) |
-            (Transaction.merchant.ilike(f'%{search}%'))
-        )
-    if start_date:
-        query = query.filter(Transaction.date >=
-                             datetime.fromisoformat(start_date))
-    if end_date:
-        query = query.filter(Transaction.date <=
-                             datetime.fromisoformat(end_date))
-    if category_id:
-        query = query.filter(Transaction.category_id == category_id)
-    if account_id:
-        query = query.filter(Transaction.account_id == account_id)
-    if is_income is not None:
-        query = query.filter(Transaction.is_income == is_income)
+            tuple_(date_key, Transaction.id) <
+            tuple_(literal(cursor_date, date_key.type), literal(cursor_id)))
+    else:
+        query = query.offset(skip)
+    rows = query.limit(limit).all()
+
+    if rows and len(rows) == limit and not ranked:
+        response.headers["X-Next-Cursor"] = encode_cursor(
+            rows[-1].date_key, rows[-1].id)
+
+    return [transaction_response(row) for row in rows]
+
+
+# Rows fetched from the database and written to the response at a time
+EXPORT_BATCH_SIZE = 1000
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+EXPORT_FIELDS = list(TransactionResponse.model_fields)
+
+
+def export_transaction_chunks(query, export_format: str):
+    """Serialize the rows of a query_transaction_rows() query batch by batch.
+
+    The export keeps its own session, since the request's session from
+    get_db is closed before the response body is sent, and iterates a
+    single cursor with yield_per so only one batch is held in memory.
+    """
+    db = SessionLocal()
+    try:
+        rows = query.with_session(db).yield_per(EXPORT_BATCH_SIZE)
+        buffer = StringIO()
+        writer = csv.writer(buffer) if export_format == "csv" else None
+        if writer:
+            writer.writerow(EXPORT_FIELDS)
+        count = 0
+        for row in rows:
+            values = row._mapping
+            date = values['date'].isoformat() if values['date'] else None
+            if writer:
+                writer.writerow([date if field == 'date' else values[field]
+                                 for field in EXPORT_FIELDS])
+            else:
+                record = {field: values[field] for field in EXPORT_FIELDS}
+                record['date'] = date
+                buffer.write(json.dumps(record, ensure_ascii=False))
+                buffer.write("\n")
+            count += 1
+            if count % EXPORT_BATCH_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        db.close()
+
+
+@app.get("/api/transactions/export")
+def export_transactions(
+    format: str = "ndjson",
+    search: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    category_id: Optional[int] = None,
+    account_id: Optional[int] = None,
+    is_income: Optional[bool] = None,
+    db: Session = Depends(get_db)
+):
+    """Stream every transaction matching the GET /api/transactions filters,
+    newest first, as NDJSON or CSV with the TransactionResponse fields.
+    There is no limit; rows are written as they are read."""
+    if format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(status_code=400,
+                            detail=f"format must be one of {', '.join(EXPORT_MEDIA_TYPES)}")
+    query = query_transaction_rows(db).filter(Transaction.user_id == 1)
+    query, _ = filter_transaction_rows(
+        query, search, start_date, end_date, category_id, account_id, is_income)
+    query = query.order_by(Transaction.date.desc(), Transaction.id.desc())
+
+    return StreamingResponse(
+        export_transaction_chunks(query, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="transactions.{format}"'})
+
+
+# Correcting entries, left out of the transaction totals as on the
+# Transactions screen
+TOTALS_EXCLUDED_CATEGORY = "Balance Correction"
+
+
+@app.get("/api/transactions/summary")
+def get_transactions_summary(
+    search: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    category_id: Optional[int] = None,
+    account_id: Optional[int] = None,
+    is_income: Optional[bool] = None,
+    db: Session = Depends(get_db)
+):
+    """Count and net total (income minus expenses) of every transaction
+    matching the GET /api/transactions filters, overall and per account,
+    in one grouped query"""
+    counted = or_(Category.name.is_(None), Category.name != TOTALS_EXCLUDED_CATEGORY)
+    query = db.query(
+        Account.name,
+        func.count(Transaction.id),
+        func.count(case((counted, Transaction.id))),
+        func.sum(case((counted, case((Transaction.is_income, Transaction.amount),
+                                     else_=-Transaction.amount)), else_=0))
+    ).select_from(Transaction).outerjoin(
+        Account, Transaction.account_id == Account.id
+    ).outerjoin(
+        Category, Transaction.category_id == Category.id
+    ).filter(Transaction.user_id == 1)
+    query, _ = filter_transaction_rows(
+        query, search, start_date, end_date, category_id, account_id, is_income)
+    rows = query.group_by(Account.name).order_by(Account.name).all()
+
+    return {
+        "count": sum(count for _, count, _, _ in rows),
+        "total": sum(total or 0 for _, _, _, total in rows),
+        "accounts": [{"account_name": name, "total": total or 0}
+                     for name, _, counted_rows, total in rows if counted_rows]
+    }
+
+
+# Helper functions for columnar export
+
+ARROW_EXPORT_BATCH_SIZE = 16384
+ARROW_EXPORT_MEDIA_TYPES = {"parquet": "application/vnd.apache.parquet",
+                            "arrow": "application/vnd.apache.arrow.stream"}
+ARROW_EXPORT_EXTENSIONS = {"parquet": "parquet", "arrow": "arrows"}
+# Query and (column, type) list of each exported table. 'dictionary'
+# columns repeat a few distinct values and are stored dictionary-encoded.
+ARROW_EXPORT_TABLES = {
+    "transactions": (
+        """SELECT t.id, t.account_id, t.category_id, t.amount, t.currency,
+                  t.title, t.note, t.date, t.is_income, t.merchant,
+                  a.name, c.name, c.color
+           FROM transactions t
+           LEFT JOIN accounts a ON a.id = t.account_id
+           LEFT JOIN categories c ON c.id = t.category_id
+           WHERE t.user_id = ? ORDER BY t.date, t.id""",
+        [("id", "int64"), ("account_id", "int64"), ("category_id", "int64"),
+         ("amount", "float64"), ("currency", "dictionary"), ("title", "dictionary"),
+         ("note", "string"), ("date", "timestamp"), ("is_income", "bool"),
+         ("merchant", "dictionary"), ("account_name", "dictionary"),
+         ("category_name", "dictionary"), ("category_color", "dictionary")]),
+    "accounts": (
+        # The balance /api/accounts reports, not the unmaintained column
+        """SELECT a.id, a.name, a.account_type, coalesce(b.balance, 0),
+                  a.currency, a.color, a.created_at
+           FROM accounts a
+           LEFT JOIN account_balances b ON b.account_id = a.id
+           WHERE a.user_id = ? ORDER BY a.id""",
+        [("id", "int64"), ("name", "string"), ("account_type", "dictionary"),
+         ("balance", "float64"), ("currency", "dictionary"), ("color", "string"),
+         ("created_at", "timestamp")]),
+    "categories": (
+        """SELECT id, name, type, color, icon
+           FROM categories WHERE user_id = ? ORDER BY id""",
+        [("id", "int64"), ("name", "string"), ("type", "dictionary"),
+         ("color", "string"), ("icon", "string")]),
+    "merchant_mappings": (
+        """SELECT id, amount, statement_title, clean_title, mapped_title,
+                  merchant, category_id, source, created_at
+           FROM merchant_mappings WHERE user_id = ? ORDER BY id""",
+        [("id", "int64"), ("amount", "float64"), ("statement_title", "string"),
+         ("clean_title", "dictionary"), ("mapped_title", "dictionary"),
+         ("merchant", "dictionary"), ("category_id", "int64"),
+         ("source", "dictionary"), ("created_at", "timestamp")]),
+}
+
+
+def arrow_schema(columns):
+    types = {"int64": pa.int64(), "float64": pa.float64(), "string": pa.string(),
+             "bool": pa.bool_(), "timestamp": pa.timestamp("us"),
+             "dictionary": pa.dictionary(pa.int32(), pa.string())}
+    return pa.schema([(name, types[kind]) for name, kind in columns])
+
+
+class ChunkSink:
+    """Write-only file object that hands out what was written since the
+    last take(), so a writer's output can be streamed as it is produced"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def arrow_table_chunks(conn, table: str, export_format: str, user_id: int = 1):
+    """Write one table as Parquet or an Arrow IPC stream, yielding the bytes
+    after every batch.
+
+    Rows come straight from a DBAPI cursor in ARROW_EXPORT_BATCH_SIZE
+    batches; each batch becomes one record batch (one Parquet row group).
+    SQLite hands back dates as text and booleans as integers, so every
+    column is cast to its schema type. Both formats are zstd compressed.
+    """
+    sql, columns = ARROW_EXPORT_TABLES[table]
+    schema = arrow_schema(columns)
+    sink = ChunkSink()
+    if export_format == "parquet":
+        writer = pq.ParquetWriter(
+            sink, schema, compression="zstd",
+            use_dictionary=[name for name, kind in columns if kind == "dictionary"])
+    else:
+        writer = pa.ipc.new_stream(
+            sink, schema, options=pa.ipc.IpcWriteOptions(compression="zstd"))
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql, (user_id,))
+        while True:
+            rows = cursor.fetchmany(ARROW_EXPORT_BATCH_SIZE)
+            if not rows:
+                break
+            arrays = [pa.array(values).cast(field.type)
+                      for values, field in zip(zip(*rows), schema)]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            yield sink.take()
+    finally:
+        cursor.close()
+    writer.close()
+    yield sink.take()
+
 
-    transactions = query.order_by(
-        Transaction.date.desc()).offset(skip).limit(limit).all()
-
-    result = []
-    for t in transactions:
-        result.append(TransactionResponse(
-            id=t.id,
-            account_id=t.account_id,
-            category_id=t.category_id,
-            amount=t.amount,
-            currency=t.currency,
-            title=t.title,
-            note=t.note,
-            date=t.date,
-            is_income=t.is_income,
-            merchant=t.merchant,
-            account_name=t.account.name if t.account else None,
-            category_name=t.category.name if t.category else None,
-            category_color=t.category.color if t.category else None
-        ))
-
-    return result
+def arrow_export_chunks(tables, export_format: str, archive: bool):
+    """Stream tables from one read transaction, so they are consistent with
+    each other. With archive, each table is a file in a zip archive;
+    the files are already compressed, so the archive only stores them."""
+    conn = engine.raw_connection()
+    try:
+        conn.cursor().execute("BEGIN")
+        if not archive:
+            for table in tables:
+                yield from arrow_table_chunks(conn, table, export_format)
+            return
+        sink = ChunkSink()
+        with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED) as zip_file:
+            for table in tables:
+                with zip_file.open(f"{table}.{ARROW_EXPORT_EXTENSIONS[export_format]}",
+                                   "w", force_zip64=True) as entry:
+                    for chunk in arrow_table_chunks(conn, table, export_format):
+                        entry.write(chunk)
+                        yield sink.take()
+        yield sink.take()
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+def check_arrow_export(export_format: str):
+    if not ARROW_AVAILABLE:
+        raise HTTPException(status_code=501,
+                            detail="Columnar export needs pyarrow (pip install pyarrow)")
+    if engine.dialect.name != "sqlite":
+        raise HTTPException(status_code=501,
+                            detail="Columnar export reads the SQLite database directly")
+    if export_format not in ARROW_EXPORT_MEDIA_TYPES:
+        raise HTTPException(status_code=400,
+                            detail=f"format must be one of {', '.join(ARROW_EXPORT_MEDIA_TYPES)}")
+
+
+@app.get("/api/export/snapshot")
+def export_snapshot(format: str = "parquet"):
+    """Zip archive of transactions, accounts, categories and merchant
+    mappings, one Parquet or Arrow IPC stream file per table"""
+    check_arrow_export(format)
+    return StreamingResponse(
+        arrow_export_chunks(list(ARROW_EXPORT_TABLES), format, archive=True),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="snapshot-{format}.zip"'})
+
+
+@app.get("/api/export/{table}")
+def export_table(table: str, format: str = "parquet"):
+    """One table as a Parquet file or an Arrow IPC stream, for loading
+    into pandas, polars or DuckDB without going through JSON pages"""
+    check_arrow_export(format)
+    if table not in ARROW_EXPORT_TABLES:
+        raise HTTPException(status_code=404, detail="Unknown table")
+    return StreamingResponse(
+        arrow_export_chunks([table], format, archive=False),
+        media_type=ARROW_EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{table}.{ARROW_EXPORT_EXTENSIONS[format]}"'})
 
 
 @app.post("/api/transactions", response_model=TransactionResponse)
-async def create_transaction(transaction: TransactionCreate, db: Session = Depends(get_db)):
+def create_transaction(transaction: TransactionCreate, db: Session = Depends(get_db)):
     # Find better title from merchant mappings
     better_title = find_merchant_title(
         transaction.amount, transaction.title, db, user_id=1)
@@ -429,74 +1799,145 @@ async def create_transaction(transaction: TransactionCreate, db: Session = Depen
     transaction_data = transaction.dict()
     transaction_data['title'] = better_title  # Use the mapped title
 
-    db_transaction = Transaction(user_id=1, **transaction_data)
-    db.add(db_transaction)
+    result = db.execute(insert(Transaction).values(
+        user_id=1, **transaction_data))
+    deltas = {}
+    add_rollup_delta(deltas, 1, transaction.date, transaction.category_id,
+                     transaction.account_id, transaction.is_income, transaction.amount)
+    apply_rollup_deltas(db, deltas)
+    bump_data_version(db, 1)
     db.commit()
-    db.refresh(db_transaction)
-
-    return TransactionResponse(
-        id=db_transaction.id,
-        account_id=db_transaction.account_id,
-        category_id=db_transaction.category_id,
-        amount=db_transaction.amount,
-        currency=db_transaction.currency,
-        title=db_transaction.title,
-        note=db_transaction.note,
-        date=db_transaction.date,
-        is_income=db_transaction.is_income,
-        merchant=db_transaction.merchant,
-        account_name=db_transaction.account.name,
-        category_name=db_transaction.category.name,
-        category_color=db_transaction.category.color
-    )
+
+    return get_transaction_response(db, result.inserted_primary_key[0])
+
+
+def insert_transactions_batch(transactions: List[TransactionCreate], db: Session, user_id: int = 1):
+    """Validate, title-map and insert TransactionCreate items without
+    committing.
+
+    Returns one result per item, either {"index", "status": "created",
+    "id"} or {"index", "status": "error", "detail"}, plus the number of
+    titles replaced by a merchant mapping.
+    """
+    account_ids = {a for (a,) in db.query(Account.id).filter(Account.user_id == user_id)}
+    category_ids = {c for (c,) in db.query(Category.id).filter(Category.user_id == user_id)}
+
+    results = [None] * len(transactions)
+    valid = []
+    for i, transaction in enumerate(transactions):
+        if transaction.account_id not in account_ids:
+            results[i] = {"index": i, "status": "error", "detail": "Account not found"}
+        elif transaction.category_id not in category_ids:
+            results[i] = {"index": i, "status": "error", "detail": "Category not found"}
+        else:
+            valid.append(i)
+
+    if not valid:
+        return results, 0
+
+    # Find better titles from merchant mappings
+    better_titles = find_merchant_titles(
+        [(transactions[i].amount, transactions[i].title) for i in valid],
+        db, user_id=user_id)
+
+    now = datetime.utcnow()
+    rows = []
+    mapped = 0
+    deltas = {}
+    for i, title in zip(valid, better_titles):
+        transaction_data = transactions[i].dict()
+        if title != transaction_data['title']:
+            mapped += 1
+        transaction_data['title'] = title  # Use the mapped title
+        rows.append(dict(user_id=user_id, created_at=now, updated_at=now,
+                         **transaction_data))
+        add_rollup_delta(deltas, user_id, transactions[i].date, transactions[i].category_id,
+                         transactions[i].account_id, transactions[i].is_income, transactions[i].amount)
+
+    # RETURNING in parameter order pairs each new id with its input row
+    new_ids = db.execute(
+        insert(Transaction.__table__).returning(
+            Transaction.__table__.c.id, sort_by_parameter_order=True),
+        rows).scalars().all()
+    apply_rollup_deltas(db, deltas)
+    for i, new_id in zip(valid, new_ids):
+        results[i] = {"index": i, "status": "created", "id": new_id}
+
+    return results, mapped
+
+
+@app.post("/api/transactions/bulk")
+def create_transactions_bulk(transactions: List[TransactionCreate], db: Session = Depends(get_db)):
+    """Create many transactions in one database transaction.
+
+    Titles are resolved with a single merchant mapping lookup and the rows
+    are inserted with one executemany. Rows pointing at an unknown account
+    or category are reported as errors and skipped; the rest are created.
+    """
+    try:
+        results, _ = insert_transactions_batch(transactions, db, user_id=1)
+        bump_data_version(db, 1)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        # Drop any mappings learned for the rolled-back batch
+        merchant_index.invalidate()
+        raise HTTPException(status_code=500, detail=str(e))
+
+    new_ids = [r["id"] for r in results if r["status"] == "created"]
+    created = {row.id: transaction_response(row) for row in query_transaction_rows(db).filter(
+        Transaction.id.in_(new_ids))}
+    for r in results:
+        if r["status"] == "created":
+            r["transaction"] = created[r.pop("id")]
+
+    return {
+        "created": len(new_ids),
+        "failed": len(transactions) - len(new_ids),
+        "results": results
+    }
 
 
 @app.put("/api/transactions/{transaction_id}", response_model=TransactionResponse)
-async def update_transaction(transaction_id: int, transaction: TransactionCreate, db: Session = Depends(get_db)):
-    db_transaction = db.query(Transaction).filter(
-        Transaction.id == transaction_id, Transaction.user_id == 1).first()
+def update_transaction(transaction_id: int, transaction: TransactionCreate, db: Session = Depends(get_db)):
+    old = db.query(
+        Transaction.date, Transaction.category_id, Transaction.account_id,
+        Transaction.is_income, Transaction.amount
+    ).filter(Transaction.id == transaction_id, Transaction.user_id == 1).first()
 
-    if not db_transaction:
+    if not old:
         raise HTTPException(status_code=404, detail="Transaction not found")
 
-    db_transaction.account_id = transaction.account_id
-    db_transaction.category_id = transaction.category_id
-    db_transaction.amount = transaction.amount
-    db_transaction.currency = transaction.currency
-    db_transaction.title = transaction.title
-    db_transaction.note = transaction.note
-    db_transaction.date = transaction.date
-    db_transaction.is_income = transaction.is_income
-    db_transaction.merchant = transaction.merchant
-    db_transaction.updated_at = datetime.utcnow()
-
+    db.execute(update(Transaction).where(
+        Transaction.id == transaction_id, Transaction.user_id == 1
+    ).values(
+        updated_at=datetime.utcnow(), **transaction.dict()
+    ))
+
+    deltas = {}
+    add_rollup_delta(deltas, 1, old.date, old.category_id, old.account_id,
+                     old.is_income, -(old.amount or 0.0), -1)
+    add_rollup_delta(deltas, 1, transaction.date, transaction.category_id,
+                     transaction.account_id, transaction.is_income, transaction.amount)
+    apply_rollup_deltas(db, deltas)
+    bump_data_version(db, 1)
     db.commit()
-    db.refresh(db_transaction)
-
-    return TransactionResponse(
-        id=db_transaction.id,
-        account_id=db_transaction.account_id,
-        category_id=db_transaction.category_id,
-        amount=db_transaction.amount,
-        currency=db_transaction.currency,
-        title=db_transaction.title,
-        note=db_transaction.note,
-        date=db_transaction.date,
-        is_income=db_transaction.is_income,
-        merchant=db_transaction.merchant,
-        account_name=db_transaction.account.name,
-        category_name=db_transaction.category.name,
-        category_color=db_transaction.category.color
-    )
+
+    return get_transaction_response(db, transaction_id)
 
 
 @app.delete("/api/transactions/{transaction_id}")
-async def delete_transaction(transaction_id: int, db: Session = Depends(get_db)):
+def delete_transaction(transaction_id: int, db: Session = Depends(get_db)):
     transaction = db.query(Transaction).filter(
         Transaction.id == transaction_id).first()
     if not transaction:
         raise HTTPException(status_code=404, detail="Transaction not found")
+    deltas = {}
+    add_rollup_delta(deltas, transaction.user_id, transaction.date, transaction.category_id,
+                     transaction.account_id, transaction.is_income, -(transaction.amount or 0.0), -1)
     db.delete(transaction)
+    apply_rollup_deltas(db, deltas)
+    bump_data_version(db, transaction.user_id)
     db.commit()
     return {"message": "Transaction deleted"}
 
@@ -504,7 +1945,7 @@ async def delete_transaction(transaction_id: int, db: Session = Depends(get_db))
 # Merchant Mappings
 
 @app.get("/api/merchant-mappings")
-async def get_merchant_mappings(db: Session = Depends(get_db)):
+def get_merchant_mappings(db: Session = Depends(get_db)):
     """Get all merchant mappings for the user"""
     mappings = db.query(MerchantMapping).filter(
         MerchantMapping.user_id == 1).all()
@@ -512,62 +1953,59 @@ async def get_merchant_mappings(db: Session = Depends(get_db)):
 
 
 @app.post("/api/merchant-mappings/reload")
-async def reload_merchant_mappings(db: Session = Depends(get_db)):
-    """Reload merchant mappings from input.csv and save to database"""
+def reload_merchant_mappings(db: Session = Depends(get_db)):
+    """Reload merchant mappings from input.csv and save to database.
+
+    One batched upsert: new keys are inserted, earlier input.csv rows get
+    the current title and category, manual and generated mappings are
+    left alone.
+    """
     try:
+        started = time.perf_counter()
         mappings = load_merchant_mappings_from_csv()
-        saved_count = 0
 
+        category_ids = {}
+        for category_id, name in db.query(Category.id, Category.name).order_by(Category.id):
+            if name:
+                category_ids.setdefault(name.lower(), category_id)
+
+        now = datetime.utcnow()
+        rows = []
         for key, data in mappings.items():
-            # key is f"{amount}_{title.lower()}"
-            amount = float(key.split('_')[0])
-            # In our current load_merchant_mappings_from_csv, title is the mapped title
-            statement_title = data['title']
-            # Actually, statement_title should be the one we are matching against.
-            # But the CSV has 'title' which is the mapped title.
-            # This is a bit ambiguous in the current implementation.
-
-            # For now, let's just make sure the reload endpoint actually does something useful.
-            # If the user wants to see them in the table, they need to be in the database.
-
-            # Let's check if we have enough info to save
+            # key is f"{amount}_{title.lower()}"; the CSV only has the mapped
+            # title, so it doubles as the statement title
             if not data.get('title'):
                 continue
-
-            # We don't have the original statement title in the CSV usually,
-            # unless we assume the CSV 'title' is both or we have another column.
-            # In find_merchant_title, it uses f"{amount}_{clean_title.lower()}" as search key.
-            # So the CSV 'title' is likely the Cleaned Title.
-
-            existing = db.query(MerchantMapping).filter(
-                MerchantMapping.user_id == 1,
-                MerchantMapping.amount == amount,
-                MerchantMapping.mapped_title == data['title']
-            ).first()
-
-            if not existing:
-                # Look up category_id
-                category_id = None
-                if data.get('category'):
-                    cat = db.query(Category).filter(
-                        Category.name.ilike(data.get('category'))
-                    ).first()
-                    if cat:
-                        category_id = cat.id
-
-                merchant_map = MerchantMapping(
-                    user_id=1,
-                    amount=amount,
-                    statement_title=data['title'],  # Fallback
-                    clean_title=data['title'].lower(),
-                    mapped_title=data['title'],
-                    category_id=category_id
-                )
-                db.add(merchant_map)
-                saved_count += 1
-
+            rows.append(dict(
+                user_id=1,
+                amount=float(key.split('_')[0]),
+                statement_title=data['title'],
+                clean_title=data['title'].lower(),
+                mapped_title=data['title'],
+                category_id=category_ids.get(data['category'].lower())
+                if data.get('category') else None,
+                source='csv',
+                created_at=now
+            ))
+
+        before = db.query(func.count(MerchantMapping.id)).scalar()
+        stmt = upsert_statement(db, MerchantMapping)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[literal_column(MAPPING_KEY)],
+            set_={'mapped_title': stmt.excluded.mapped_title,
+                  'category_id': stmt.excluded.category_id},
+            where=and_(
+                MerchantMapping.source == stmt.excluded.source,
+                or_(MerchantMapping.mapped_title.is_distinct_from(stmt.excluded.mapped_title),
+                    MerchantMapping.category_id.is_distinct_from(stmt.excluded.category_id))))
+        written = db.execute(stmt, rows).rowcount if rows else 0
+        saved_count = db.query(func.count(MerchantMapping.id)).scalar() - before
         db.commit()
-        return {"status": "success", "count": saved_count, "total_loaded": len(mappings), "message": f"Saved {saved_count} new merchant mappings from input.csv"}
+        merchant_index.invalidate()
+        return {"status": "success", "count": saved_count, "updated": written - saved_count,
+                "total_loaded": len(mappings),
+                "seconds": round(time.perf_counter() - started, 3),
+                "message": f"Saved {saved_count} new merchant mappings from input.csv"}
     except Exception as e:
         db.rollback()
         print(f"Error reloading merchant mappings: {e}")
@@ -575,7 +2013,7 @@ async def reload_merchant_mappings(db: Session = Depends(get_db)):
 
 
 @app.post("/api/merchant-mappings")
-async def add_merchant_mapping(
+def add_merchant_mapping(
     amount: float,
     statement_title: str,
     mapped_title: str,
@@ -583,50 +2021,76 @@ async def add_merchant_mapping(
     category_id: Optional[int] = None,
     db: Session = Depends(get_db)
 ):
-    """Manually add a merchant mapping"""
+    """Manually add a merchant mapping.
+
+    An existing mapping for the same amount and statement title is taken
+    over, so regenerating mappings from statements leaves it alone.
+    """
     clean_title = clean_upi_title(statement_title)
 
-    merchant_map = MerchantMapping(
-        user_id=1,
-        amount=amount,
-        statement_title=statement_title,
-        clean_title=clean_title,
-        mapped_title=mapped_title,
-        category_id=category_id
-    )
-    db.add(merchant_map)
+    merchant_map = db.query(MerchantMapping).filter(text(MAPPING_KEY_MATCH).bindparams(
+        user_id=1, amount=amount, statement_title=statement_title)).first()
+    replaced = merchant_map is not None
+    if not replaced:
+        merchant_map = MerchantMapping(
+            user_id=1, amount=amount, statement_title=statement_title)
+        db.add(merchant_map)
+    merchant_map.clean_title = clean_title
+    merchant_map.mapped_title = mapped_title
+    merchant_map.category_id = category_id
+    merchant_map.source = 'manual'
     db.commit()
     db.refresh(merchant_map)
+    if replaced:
+        merchant_index.invalidate()
+    else:
+        merchant_index.add(1, amount, statement_title, clean_title, mapped_title)
     return merchant_map
 
+
+@app.get("/api/merchant-mappings/index-stats")
+def get_merchant_index_stats():
+    """Size and hit ratio of the in-memory merchant mapping index"""
+    return merchant_index.stats()
+
 # Accounts
 
 
 @app.get("/api/accounts")
-async def get_accounts(db: Session = Depends(get_db)):
-    accounts = db.query(Account).filter(Account.user_id == 1).all()
-    result = []
-    for account in accounts:
-        # Calculate balance from transactions
-        total = db.query(func.sum(Transaction.amount)).filter(
-            Transaction.account_id == account.id
-        ).scalar() or 0
-
-        result.append({
+def get_accounts(db: Session = Depends(get_db)):
+    accounts = db.query(Account, AccountBalance.balance).outerjoin(
+        AccountBalance, AccountBalance.account_id == Account.id
+    ).filter(Account.user_id == 1).all()
+    return [
+        {
             "id": account.id,
             "name": account.name,
             "account_type": account.account_type,
-            "balance": total,
+            "balance": balance or 0,
             "currency": account.currency,
             "color": account.color
-        })
-    return result
+        }
+        for account, balance in accounts
+    ]
+
+
+@app.get("/api/accounts/balances/verify")
+def verify_balances(db: Session = Depends(get_db)):
+    """Report accounts whose stored balance differs from their transactions"""
+    return verify_account_balances(db)
+
+
+@app.post("/api/accounts/balances/rebuild")
+def rebuild_balances(db: Session = Depends(get_db)):
+    """Report drift, then recompute every stored balance"""
+    return verify_account_balances(db, rebuild=True)
 
 
 @app.post("/api/accounts")
-async def create_account(account: AccountCreate, db: Session = Depends(get_db)):
+def create_account(account: AccountCreate, db: Session = Depends(get_db)):
     db_account = Account(user_id=1, **account.dict())
     db.add(db_account)
+    bump_data_version(db, 1)
     db.commit()
     db.refresh(db_account)
     return db_account
@@ -635,15 +2099,16 @@ async def create_account(account: AccountCreate, db: Session = Depends(get_db)):
 
 
 @app.get("/api/categories")
-async def get_categories(db: Session = Depends(get_db)):
+def get_categories(db: Session = Depends(get_db)):
     categories = db.query(Category).filter(Category.user_id == 1).all()
     return categories
 
 
 @app.post("/api/categories")
-async def create_category(category: CategoryCreate, db: Session = Depends(get_db)):
+def create_category(category: CategoryCreate, db: Session = Depends(get_db)):
     db_category = Category(user_id=1, **category.dict())
     db.add(db_category)
+    bump_data_version(db, 1)
     db.commit()
     db.refresh(db_category)
     return db_category
@@ -652,63 +2117,36 @@ async def create_category(category: CategoryCreate, db: Session = Depends(get_db
 
 
 @app.get("/api/analytics/overview")
-async def get_overview(db: Session = Depends(get_db)):
+def get_overview(db: Session = Depends(get_db)):
     # Get current month
     now = datetime.now()
     start_of_month = datetime(now.year, now.month, 1)
 
-    # Total expenses and income
-    total_expenses = db.query(func.sum(Transaction.amount)).filter(
-        Transaction.user_id == 1,
-        Transaction.is_income == False
-    ).scalar() or 0
-
-    total_income = db.query(func.sum(Transaction.amount)).filter(
-        Transaction.user_id == 1,
-        Transaction.is_income == True
-    ).scalar() or 0
-
-    # This month
-    month_expenses = db.query(func.sum(Transaction.amount)).filter(
-        Transaction.user_id == 1,
-        Transaction.is_income == False,
-        Transaction.date >= start_of_month
-    ).scalar() or 0
-
-    month_income = db.query(func.sum(Transaction.amount)).filter(
-        Transaction.user_id == 1,
-        Transaction.is_income == True,
-        Transaction.date >= start_of_month
-    ).scalar() or 0
-
-    # Transaction count
-    total_transactions = db.query(func.count(Transaction.id)).filter(
-        Transaction.user_id == 1
-    ).scalar() or 0
+    # Read the version before querying so a concurrent write can only make
+    # the cached entry stale, never wrongly current
+    key = (1, start_of_month)
+    version = data_version(db, 1)
+    cached = _overview_cache.get(key)
+    if cached and cached[0] == version:
+        return cached[1]
 
-    return {
-        "total_expenses": total_expenses,
-        "total_income": total_income,
-        "net_savings": total_income - total_expenses,
-        "month_expenses": month_expenses,
-        "month_income": month_income,
-        "month_net": month_income - month_expenses,
-        "total_transactions": total_transactions
-    }
+    overview = compute_overview(db, 1, start_of_month)
+    _overview_cache[key] = (version, overview)
+    return overview
 
 
 @app.get("/api/analytics/category-breakdown")
-async def get_category_breakdown(db: Session = Depends(get_db)):
+def get_category_breakdown(db: Session = Depends(get_db)):
     results = db.query(
         Category.name,
         Category.color,
         Category.icon,
-        func.sum(Transaction.amount).label('total'),
-        func.count(Transaction.id).label('count')
-    ).join(Transaction).filter(
-        Transaction.user_id == 1,
-        Transaction.is_income == False
-    ).group_by(Category.id).all()
+        func.sum(MonthlyRollup.total).label('total'),
+        func.sum(MonthlyRollup.count).label('count')
+    ).join(MonthlyRollup, MonthlyRollup.category_id == Category.id).filter(
+        MonthlyRollup.user_id == 1,
+        MonthlyRollup.is_income == False
+    ).group_by(Category.id).having(func.sum(MonthlyRollup.count) > 0).all()
 
     return [
         {
@@ -723,20 +2161,21 @@ async def get_category_breakdown(db: Session = Depends(get_db)):
 
 
 @app.get("/api/analytics/monthly-trend")
-async def get_monthly_trend(db: Session = Depends(get_db)):
+def get_monthly_trend(db: Session = Depends(get_db)):
     results = db.query(
-        extract('year', Transaction.date).label('year'),
-        extract('month', Transaction.date).label('month'),
-        func.sum(Transaction.amount).label('total'),
-        func.count(Transaction.id).label('count')
+        MonthlyRollup.year_month,
+        func.sum(MonthlyRollup.total).label('total'),
+        func.sum(MonthlyRollup.count).label('count')
     ).filter(
-        Transaction.user_id == 1,
-        Transaction.is_income == False
-    ).group_by('year', 'month').order_by('year', 'month').all()
+        MonthlyRollup.user_id == 1,
+        MonthlyRollup.is_income == False
+    ).group_by(MonthlyRollup.year_month).having(
+        func.sum(MonthlyRollup.count) > 0
+    ).order_by(MonthlyRollup.year_month).all()
 
     return [
         {
-            "month": f"{int(r.year)}-{int(r.month):02d}",
+            "month": r.year_month,
             "total": r.total,
             "count": r.count
         }
@@ -745,16 +2184,16 @@ async def get_monthly_trend(db: Session = Depends(get_db)):
 
 
 @app.get("/api/analytics/account-distribution")
-async def get_account_distribution(db: Session = Depends(get_db)):
+def get_account_distribution(db: Session = Depends(get_db)):
     results = db.query(
         Account.name,
         Account.color,
-        func.sum(Transaction.amount).label('total'),
-        func.count(Transaction.id).label('count')
-    ).join(Transaction).filter(
-        Transaction.user_id == 1,
-        Transaction.is_income == False
-    ).group_by(Account.id).all()
+        func.sum(MonthlyRollup.total).label('total'),
+        func.sum(MonthlyRollup.count).label('count')
+    ).join(MonthlyRollup, MonthlyRollup.account_id == Account.id).filter(
+        MonthlyRollup.user_id == 1,
+        MonthlyRollup.is_income == False
+    ).group_by(Account.id).having(func.sum(MonthlyRollup.count) > 0).all()
 
     return [
         {
@@ -767,8 +2206,15 @@ async def get_account_distribution(db: Session = Depends(get_db)):
     ]
 
 
+@app.post("/api/analytics/rollups/rebuild")
+def rebuild_rollups(db: Session = Depends(get_db)):
+    """Recompute the monthly rollups from scratch, e.g. after editing the
+    database outside the API"""
+    return {"status": "success", "rows": rebuild_monthly_rollups(db)}
+
+
 @app.get("/api/analytics/top-merchants")
-async def get_top_merchants(limit: int = 15, db: Session = Depends(get_db)):
+def get_top_merchants(limit: int = 15, db: Session = Depends(get_db)):
     results = db.query(
         Transaction.title,
         func.sum(Transaction.amount).label('total'),
@@ -791,106 +2237,445 @@ async def get_top_merchants(limit: int = 15, db: Session = Depends(get_db)):
 
 # Import CSV
 
+IMPORT_CSV_DATE_FORMAT = '%d-%m-%Y %H:%M'
+IMPORT_BATCH_SIZE = 50000
+
+
+def get_or_create_ids(db: Session, model, names, new_values, user_id: int = 1) -> dict:
+    """Map each name to the id of the user's account/category with that
+    name, inserting the missing ones in one batch. new_values(name) gives
+    the extra column values for a new row."""
+    # A NaN would also set the bind type of the IN list and break it
+    names = [name for name in names if pd.notna(name)]
+
+    def existing_ids():
+        ids = {}
+        rows = db.query(model.name, model.id).filter(
+            model.user_id == user_id, model.name.in_(names)
+        ).order_by(model.id)
+        for name, row_id in rows:
+            ids.setdefault(name, row_id)
+        return ids
+
+    ids = existing_ids()
+    missing = [name for name in names if name not in ids]
+    if missing:
+        db.execute(insert(model.__table__), [
+            dict(user_id=user_id, name=name, **new_values(name)) for name in missing
+        ])
+        ids = existing_ids()
+    return ids
+
+
+def csv_lines(index) -> str:
+    """CSV line numbers of data rows (header is line 1), at most 20 listed"""
+    lines = [str(i + 2) for i in index]
+    return ', '.join(lines[:20]) + (f" and {len(lines) - 20} more" if len(lines) > 20 else "")
+
+
+def import_transactions_frame(df: pd.DataFrame, db: Session, user_id: int = 1) -> int:
+    """Insert a DataFrame in the /api/import/csv format.
+
+    Dates are parsed in one vectorized call, accounts and categories are
+    resolved with one upsert of their unique names, and rows go in through
+    executemany batches. Nothing is committed, so the caller decides the
+    transaction boundary. Rows with a blank account or category name or a
+    date not in IMPORT_CSV_DATE_FORMAT are rejected with a 400 naming their
+    CSV lines (df.index counts data rows from 0).
+    """
+    if df.empty:
+        return 0
+
+    blank = pd.Series(False, index=df.index)
+    for name_column in ('account', 'category name'):
+        names = df[name_column]
+        blank |= names.isna() | names.astype(str).str.strip().eq('')
+    if blank.any():
+        raise HTTPException(status_code=400, detail=(
+            f"Blank account or category name on CSV line {csv_lines(df.index[blank])}"))
+
+    dates = pd.to_datetime(df['date'], format=IMPORT_CSV_DATE_FORMAT, errors='coerce')
+    if dates.isna().any():
+        raise HTTPException(status_code=400, detail=(
+            f"Date not in DD-MM-YYYY HH:MM format on CSV line {csv_lines(df.index[dates.isna()])}"))
+
+    account_ids = get_or_create_ids(
+        db, Account, df['account'].unique(),
+        lambda name: dict(account_type="imported"), user_id)
+
+    # A new category takes its type from the first row that uses it
+    first_income = df.drop_duplicates('category name').set_index(
+        'category name')['income']
+    category_ids = get_or_create_ids(
+        db, Category, first_income.index,
+        lambda name: dict(type="income" if first_income[name] else "expense",
+                          color="#6366f1", icon="💰"), user_id)
+
+    def text(series):
+        return series.astype(object).where(series.notna(), None)
+
+    now = datetime.utcnow()
+    rows = pd.DataFrame({
+        'user_id': user_id,
+        'account_id': df['account'].map(account_ids),
+        'category_id': df['category name'].map(category_ids),
+        'amount': df['amount'].astype(float),
+        'currency': text(df['currency']),
+        'title': text(df['title']),
+        'note': text(df['note']),
+        'date': dates,
+        'is_income': df['income'].astype(bool),
+        'merchant': text(df['title']),
+        'created_at': now,
+        'updated_at': now
+    })
+
+    # Core insert on the Table: the ORM bulk path would split the batch
+    # wherever the set of NULL columns changes
+    for start in range(0, len(rows), IMPORT_BATCH_SIZE):
+        batch = rows.iloc[start:start + IMPORT_BATCH_SIZE]
+        db.execute(insert(Transaction.__table__), batch.to_dict('records'))
+
+    sums = rows.groupby(
+        [dates.dt.strftime('%Y-%m'), 'category_id', 'account_id', 'is_income']
+    )['amount'].agg(['sum', 'count'])
+    apply_rollup_deltas(db, {
+        rollup_key(user_id, year_month, int(category_id), int(account_id), is_income): (float(total), int(count))
+        for (year_month, category_id, account_id, is_income), (total, count) in sums.iterrows()
+    })
+
+    return len(rows)
+
 
 @app.post("/api/import/csv")
-async def import_csv(file: UploadFile = File(...), db: Session = Depends(get_db)):
-    contents = await file.read()
-    df = pd.read_csv(StringIO(contents.decode('utf-8')))
-
-    # Get or create accounts and categories
-    account_map = {}
-    category_map = {}
-
-    for _, row in df.iterrows():
-        # Get or create account
-        if row['account'] not in account_map:
-            account = db.query(Account).filter(
-                Account.user_id == 1,
-                Account.name == row['account']
-            ).first()
-            if not account:
-                account = Account(
-                    user_id=1, name=row['account'], account_type="imported")
-                db.add(account)
-                db.commit()
-                db.refresh(account)
-            account_map[row['account']] = account.id
-
-        # Get or create category
-        if row['category name'] not in category_map:
-            category = db.query(Category).filter(
-                Category.user_id == 1,
-                Category.name == row['category name']
-            ).first()
-            if not category:
-                cat_type = "income" if row['income'] else "expense"
-                category = Category(
-                    user_id=1,
-                    name=row['category name'],
-                    type=cat_type,
-                    color="#6366f1",
-                    icon="💰"
-                )
-                db.add(category)
-                db.commit()
-                db.refresh(category)
-            category_map[row['category name']] = category.id
-
-        # Create transaction
-        transaction = Transaction(
-            user_id=1,
-            account_id=account_map[row['account']],
-            category_id=category_map[row['category name']],
-            amount=row['amount'],
-            currency=row['currency'],
-            title=row['title'],
-            note=row['note'] if pd.notna(row['note']) else None,
-            date=datetime.strptime(row['date'], '%d-%m-%Y %H:%M'),
-            is_income=row['income'],
-            merchant=row['title']
-        )
-        db.add(transaction)
+def import_csv(file: UploadFile = File(...), chunk_size: int = IMPORT_BATCH_SIZE, db: Session = Depends(get_db)):
+    """Stream an uploaded CSV into the database chunk by chunk.
+
+    pandas reads straight from the spooled upload, so peak memory follows
+    chunk_size rather than the file size. Every chunk is inserted as soon
+    as it is parsed and all of them commit together. Declared sync so the
+    parsing runs in the threadpool instead of on the event loop.
+    """
+    count = 0
+    try:
+        for chunk in pd.read_csv(file.file, chunksize=max(chunk_size, 1), encoding='utf-8'):
+            count += import_transactions_frame(chunk, db, user_id=1)
+        bump_data_version(db, 1)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return {"message": f"Imported {count} transactions"}
+
 
+@app.post("/api/import/statement")
+def parse_statement_upload(file: UploadFile = File(...), statement_format: Optional[str] = None):
+    """Parse an uploaded bank or card statement with the statement parsers.
+
+    The format is taken from statement_format, else from the file name or
+    the header row. Nothing is stored: the lines come back for the import
+    screens to map and submit.
+    """
+    file_name = file.filename or ""
+    if not file_name.lower().endswith(('.xls', '.xlsx', '.csv')):
+        raise HTTPException(status_code=400, detail="Upload an .xls, .xlsx or .csv statement")
+    try:
+        rows = read_statement_rows(BytesIO(file.file.read()), file_name)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Could not read {file_name}: {e}")
+
+    if statement_format:
+        parser = get_statement_format(statement_format)
+        if parser is None:
+            raise HTTPException(status_code=400, detail=f"Unknown statement format: {statement_format}")
+    else:
+        parser = detect_statement_format(file_name, rows)
+        if parser is None:
+            raise HTTPException(status_code=422, detail="Statement format not recognised")
+
+    lines = parse_statement(rows, parser)
+    lines['date'] = lines['date'].dt.strftime('%Y-%m-%dT%H:%M:%S')
+    lines = lines.astype(object).where(lines.notna(), None)
+    return {"format": parser.name, "count": len(lines), "rows": lines.to_dict('records')}
+
+# Import jobs
+
+IMPORT_JOBS_DIR = "./import_jobs"
+IMPORT_JOB_RECORD_BATCH = 1000
+# Identifies this process as the owner of the jobs it claims
+IMPORT_WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+# A running job whose owner has not committed progress for this long is
+# taken to be abandoned (its process died) and may be claimed again
+IMPORT_JOB_STALE_SECONDS = int(os.environ.get("IMPORT_JOB_STALE_SECONDS", "300"))
+
+# SQLite allows one writer at a time, so jobs run one after another
+import_executor = ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="import-job")
+
+
+class ImportJobLost(Exception):
+    """Another process claimed the job while this one was running it"""
+
+
+def claim_import_job(db: Session, job_id: int) -> bool:
+    """Atomically make this process the owner of a queued job, or of a
+    running one whose heartbeat is stale; False if the job is not
+    claimable. Every worker process queues the unfinished jobs at startup,
+    and only the one whose UPDATE matches runs each job."""
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=IMPORT_JOB_STALE_SECONDS)
+    claimed = db.execute(
+        update(ImportJob).where(
+            ImportJob.id == job_id,
+            (ImportJob.status == "queued") | (
+                (ImportJob.status == "running") &
+                (ImportJob.heartbeat_at.is_(None) | (ImportJob.heartbeat_at < stale)))
+        ).values(status="running", owner=IMPORT_WORKER_ID, heartbeat_at=now,
+                 started_at=func.coalesce(ImportJob.started_at, now)),
+        execution_options={"synchronize_session": False})
     db.commit()
-    return {"message": f"Imported {len(df)} transactions"}
+    return claimed.rowcount == 1
+
+
+def watch_import_job(job_id: int, delay: float = IMPORT_JOB_STALE_SECONDS):
+    """Try to claim a job again after delay seconds, in case its owner dies"""
+    timer = threading.Timer(delay, import_executor.submit, args=(run_import_job, job_id))
+    timer.daemon = True
+    timer.start()
+
+
+def commit_import_progress(db: Session, job_id: int, **counts):
+    """Add counts to the job's counters and refresh its heartbeat in the
+    same transaction as the rows just inserted, provided this process
+    still owns the job; otherwise roll the rows back and raise
+    ImportJobLost"""
+    progress = db.execute(
+        update(ImportJob).where(
+            ImportJob.id == job_id, ImportJob.owner == IMPORT_WORKER_ID
+        ).values(heartbeat_at=datetime.utcnow(),
+                 **{name: getattr(ImportJob, name) + n for name, n in counts.items()}),
+        execution_options={"synchronize_session": False})
+    if progress.rowcount != 1:
+        db.rollback()
+        raise ImportJobLost()
+    db.commit()
+
+
+def run_import_job(job_id: int):
+    """Process a job's stored payload in the background.
+
+    Each chunk commits together with the job's progress counters, so after
+    a restart the job resumes right after the last committed chunk.
+    """
+    db = SessionLocal()
+    try:
+        if not claim_import_job(db, job_id):
+            job = db.get(ImportJob, job_id)
+            if job is not None and job.status == "running" and job.owner != IMPORT_WORKER_ID:
+                watch_import_job(job_id)
+            return
+        job = db.get(ImportJob, job_id)
+        rows_parsed = job.rows_parsed
+
+        if job.kind == "csv":
+            chunks = pd.read_csv(job.file_path, chunksize=IMPORT_BATCH_SIZE,
+                                 skiprows=range(1, rows_parsed + 1), encoding='utf-8')
+            for chunk in chunks:
+                # Line numbers in errors count from the start of the file
+                chunk.index += rows_parsed
+                inserted = import_transactions_frame(chunk, db, user_id=job.user_id)
+                bump_data_version(db, job.user_id)
+                commit_import_progress(db, job_id, rows_inserted=inserted,
+                                       rows_parsed=len(chunk))
+                rows_parsed += len(chunk)
+        else:
+            with open(job.file_path) as f:
+                records = json.load(f)
+            for start in range(rows_parsed, len(records), IMPORT_JOB_RECORD_BATCH):
+                batch = [TransactionCreate(**r) for r in
+                         records[start:start + IMPORT_JOB_RECORD_BATCH]]
+                results, mapped = insert_transactions_batch(
+                    batch, db, user_id=job.user_id)
+                created = sum(1 for r in results if r["status"] == "created")
+                bump_data_version(db, job.user_id)
+                commit_import_progress(db, job_id, rows_parsed=len(batch),
+                                       rows_inserted=created,
+                                       rows_failed=len(batch) - created,
+                                       rows_mapped=mapped)
+
+        db.execute(update(ImportJob).where(
+            ImportJob.id == job_id, ImportJob.owner == IMPORT_WORKER_ID
+        ).values(status="completed", finished_at=datetime.utcnow()),
+            execution_options={"synchronize_session": False})
+        db.commit()
+        os.remove(job.file_path)
+    except ImportJobLost:
+        print(f"Import job {job_id} was taken over by another process")
+        merchant_index.invalidate()
+    except Exception as e:
+        error = e.detail if isinstance(e, HTTPException) else str(e)
+        print(f"Import job {job_id} failed: {error}")
+        db.rollback()
+        merchant_index.invalidate()
+        db.execute(update(ImportJob).where(
+            ImportJob.id == job_id, ImportJob.owner == IMPORT_WORKER_ID
+        ).values(status="failed", error=error, finished_at=datetime.utcnow()),
+            execution_options={"synchronize_session": False})
+        db.commit()
+    finally:
+        db.close()
+
+
+def import_job_status(job: ImportJob) -> dict:
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "filename": job.filename,
+        "status": job.status,
+        "rows_parsed": job.rows_parsed,
+        "rows_inserted": job.rows_inserted,
+        "rows_mapped": job.rows_mapped,
+        "rows_failed": job.rows_failed,
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at
+    }
+
+
+def submit_import_job(db: Session, kind: str, filename: Optional[str], write_payload) -> dict:
+    """Store the payload under IMPORT_JOBS_DIR, record the job and queue it"""
+    job = ImportJob(user_id=1, kind=kind, filename=filename, status="queued")
+    db.add(job)
+    db.flush()
+
+    os.makedirs(IMPORT_JOBS_DIR, exist_ok=True)
+    extension = "csv" if kind == "csv" else "json"
+    job.file_path = os.path.join(IMPORT_JOBS_DIR, f"{job.id}.{extension}")
+    try:
+        write_payload(job.file_path)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    import_executor.submit(run_import_job, job.id)
+    return import_job_status(job)
+
+
+@app.post("/api/import/jobs")
+def create_csv_import_job(file: UploadFile = File(...), db: Session = Depends(get_db)):
+    """Queue an /api/import/csv style upload and return its job right away"""
+    def write_payload(path):
+        with open(path, 'wb') as f:
+            shutil.copyfileobj(file.file, f)
+
+    return submit_import_job(db, "csv", file.filename, write_payload)
+
+
+@app.post("/api/import/jobs/transactions")
+def create_transactions_import_job(transactions: List[TransactionCreate], db: Session = Depends(get_db)):
+    """Queue a /api/transactions/bulk style payload as a background job"""
+    def write_payload(path):
+        with open(path, 'w') as f:
+            json.dump([t.dict() for t in transactions], f, default=str)
+
+    return submit_import_job(db, "transactions", None, write_payload)
+
+
+@app.get("/api/import/jobs")
+def get_import_jobs(limit: int = 20, db: Session = Depends(get_db)):
+    jobs = db.query(ImportJob).filter(ImportJob.user_id == 1).order_by(
+        ImportJob.id.desc()).limit(limit).all()
+    return [import_job_status(job) for job in jobs]
+
+
+@app.get("/api/import/jobs/{job_id}")
+def get_import_job(job_id: int, db: Session = Depends(get_db)):
+    job = db.query(ImportJob).filter(
+        ImportJob.id == job_id, ImportJob.user_id == 1).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return import_job_status(job)
 
 # Budgets
 
 
+BUDGET_HISTORY_MONTHS = 12
+
+
+def budget_history_months(now: datetime, count: int = BUDGET_HISTORY_MONTHS):
+    """(year, month) of the last count months up to now, oldest first"""
+    index = now.year * 12 + now.month - 1
+    return [(i // 12, i % 12 + 1) for i in range(index - count + 1, index + 1)]
+
+
 @app.get("/api/budgets")
-async def get_budgets(db: Session = Depends(get_db)):
-    budgets = db.query(Budget).filter(Budget.user_id == 1).all()
-    result = []
-
-    for budget in budgets:
-        # Get spending for this category in current period
-        spent = db.query(func.sum(Transaction.amount)).filter(
-            Transaction.user_id == 1,
-            Transaction.category_id == budget.category_id,
-            Transaction.is_income == False,
-            Transaction.date >= budget.start_date,
-            Transaction.date <= budget.end_date
-        ).scalar() or 0
-
-        result.append({
-            "id": budget.id,
-            "category_id": budget.category_id,
-            "category_name": budget.category.name,
-            "category_color": budget.category.color,
-            "amount": budget.amount,
-            "spent": spent,
-            "remaining": budget.amount - spent,
-            "percentage": (spent / budget.amount * 100) if budget.amount > 0 else 0,
-            "period": budget.period,
-            "start_date": budget.start_date,
-            "end_date": budget.end_date
-        })
-
-    return result
+def get_budgets(db: Session = Depends(get_db)):
+    """Every budget's spending in its own window plus its category's
+    spending over the last 12 months, from one grouped query"""
+    months = budget_history_months(datetime.now())
+    history_start = datetime(*months[0], 1)
+
+    year = extract('year', Transaction.date)
+    month = extract('month', Transaction.date)
+    in_window = and_(Transaction.date >= Budget.start_date,
+                     Transaction.date <= Budget.end_date)
+    # Compare the raw string so date-only rows on the first day still count
+    in_history = transaction_date_key() >= history_start.strftime('%Y-%m-%d')
+    rows = db.query(
+        Budget,
+        Category.name,
+        Category.color,
+        year,
+        month,
+        func.sum(case((in_window, Transaction.amount), else_=0)),
+        func.sum(case((in_history, Transaction.amount), else_=0))
+    ).outerjoin(Category, Category.id == Budget.category_id).outerjoin(Transaction, and_(
+        Transaction.user_id == Budget.user_id,
+        Transaction.category_id == Budget.category_id,
+        Transaction.is_income == False,
+        or_(in_window, in_history)
+    )).filter(Budget.user_id == 1).group_by(
+        Budget.id, Category.id, year, month
+    ).order_by(Budget.id).all()
+
+    result = {}
+    for budget, category_name, category_color, y, m, window_spent, month_spent in rows:
+        entry = result.get(budget.id)
+        if entry is None:
+            entry = result[budget.id] = {
+                "id": budget.id,
+                "category_id": budget.category_id,
+                "category_name": category_name,
+                "category_color": category_color,
+                "amount": budget.amount,
+                "spent": 0,
+                "period": budget.period,
+                "start_date": budget.start_date,
+                "end_date": budget.end_date,
+                "history": {key: 0 for key in months}
+            }
+        entry["spent"] += window_spent or 0
+        if y is not None and (int(y), int(m)) in entry["history"]:
+            entry["history"][(int(y), int(m))] += month_spent or 0
+
+    for entry in result.values():
+        spent, amount = entry["spent"], entry["amount"]
+        entry["remaining"] = amount - spent
+        entry["percentage"] = (spent / amount * 100) if amount > 0 else 0
+        entry["history"] = [
+            {"month": f"{y}-{m:02d}", "spent": month_spent,
+             "percentage": (month_spent / amount * 100) if amount > 0 else 0}
+            for (y, m), month_spent in entry["history"].items()
+        ]
+
+    return list(result.values())
 
 
 @app.post("/api/budgets")
-async def create_budget(budget: BudgetCreate, db: Session = Depends(get_db)):
+def create_budget(budget: BudgetCreate, db: Session = Depends(get_db)):
     # Set date range based on period
     now = datetime.now()
     if budget.period == "monthly":
@@ -912,6 +2697,7 @@ async def create_budget(budget: BudgetCreate, db: Session = Depends(get_db)):
         end_date=end_date
     )
     db.add(db_budget)
+    bump_data_version(db, 1)
     db.commit()
     db.refresh(db_budget)
     return db_budget
@@ -0,0 +1,99 @@
+"""
+The unique key of merchant_mappings, shared by main.py and the scripts that
+write mappings directly with sqlite3.
+
+A mapping is identified by user, amount in paise and trimmed, lower-cased
+statement title, the same key MerchantMappingIndex looks mappings up by.
+ensure_mapping_key merges existing duplicates once and then adds a unique
+index on that key, so writers can use INSERT ... ON CONFLICT.
+
+It also installs triggers that count updates and deletes of mappings in
+merchant_mappings_version. Together with max(id), which grows with every
+insert, that tells MerchantMappingIndex in main.py when another process
+or script has changed the table.
+"""
+
+MAPPING_KEY_INDEX = "ux_merchant_mappings_norm_key"
+MAPPING_KEY = "user_id, CAST(round(amount * 100) AS INTEGER), lower(trim(statement_title))"
+# WHERE clause finding the mapping with a given key; bind user_id, amount
+# and statement_title
+MAPPING_KEY_MATCH = (f"({MAPPING_KEY}) = (:user_id, CAST(round(:amount * 100) AS INTEGER), "
+                     "lower(trim(:statement_title)))")
+
+# Which duplicate survives: manual edits, then input.csv, then generated
+# rows, then rows from before the source was recorded; oldest first
+SOURCE_RANK = ("CASE source WHEN 'manual' THEN 0 WHEN 'csv' THEN 1 "
+               "WHEN 'statement' THEN 2 ELSE 3 END")
+
+# Plain SQL, also run by main.py on PostgreSQL
+COMPACT_STATEMENTS = [
+    f"""CREATE TEMP TABLE mapping_duplicates AS
+        SELECT id, FIRST_VALUE(id) OVER w AS keep_id, ROW_NUMBER() OVER w AS n
+        FROM merchant_mappings
+        WINDOW w AS (PARTITION BY {MAPPING_KEY} ORDER BY {SOURCE_RANK}, id)""",
+    # The surviving row takes its category from a duplicate if it has none
+    """UPDATE merchant_mappings SET category_id = (
+            SELECT m.category_id FROM mapping_duplicates d
+            JOIN merchant_mappings m ON m.id = d.id
+            WHERE d.keep_id = merchant_mappings.id AND m.category_id IS NOT NULL
+            ORDER BY d.n LIMIT 1)
+        WHERE category_id IS NULL
+        AND id IN (SELECT keep_id FROM mapping_duplicates WHERE n > 1)""",
+    "DELETE FROM merchant_mappings WHERE id IN (SELECT id FROM mapping_duplicates WHERE n > 1)",
+    "DROP TABLE mapping_duplicates",
+    # Exact-title key from before titles were normalized
+    "DROP INDEX IF EXISTS ux_merchant_mappings_key",
+    # Workers starting together may both get here; the compaction above is
+    # idempotent and the second index build becomes a no-op
+    f"CREATE UNIQUE INDEX IF NOT EXISTS {MAPPING_KEY_INDEX} ON merchant_mappings ({MAPPING_KEY})",
+]
+
+
+MAPPING_VERSION_STATEMENTS = [
+    """CREATE TABLE IF NOT EXISTS merchant_mappings_version (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL DEFAULT 0)""",
+    "INSERT OR IGNORE INTO merchant_mappings_version (id, version) VALUES (1, 0)",
+    """CREATE TRIGGER IF NOT EXISTS merchant_mappings_version_au
+        AFTER UPDATE ON merchant_mappings BEGIN
+        UPDATE merchant_mappings_version SET version = version + 1 WHERE id = 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS merchant_mappings_version_ad
+        AFTER DELETE ON merchant_mappings BEGIN
+        UPDATE merchant_mappings_version SET version = version + 1 WHERE id = 1;
+    END""",
+]
+# (update/delete count, max(id)) of merchant_mappings
+MAPPING_GENERATION_SQL = ("SELECT (SELECT version FROM merchant_mappings_version WHERE id = 1), "
+                          "(SELECT max(id) FROM merchant_mappings)")
+
+
+def ensure_mapping_key(conn):
+    """Merge duplicate mappings and create the unique key index, unless it
+    already exists. Takes a sqlite3 connection; returns the number of
+    duplicate rows removed."""
+    cursor = conn.cursor()
+    # Ranking duplicates needs the source column, which older tables lack
+    cursor.execute("PRAGMA table_info(merchant_mappings)")
+    if 'source' not in {row[1] for row in cursor.fetchall()}:
+        cursor.execute("ALTER TABLE merchant_mappings ADD COLUMN source VARCHAR")
+        conn.commit()
+
+    for statement in MAPPING_VERSION_STATEMENTS:
+        cursor.execute(statement)
+    conn.commit()
+
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?",
+                   (MAPPING_KEY_INDEX,))
+    if cursor.fetchone():
+        return 0
+
+    cursor.execute("SELECT COUNT(*) FROM merchant_mappings")
+    before = cursor.fetchone()[0]
+    cursor.execute("DROP TABLE IF EXISTS temp.mapping_duplicates")
+    for statement in COMPACT_STATEMENTS:
+        cursor.execute(statement)
+    cursor.execute("SELECT COUNT(*) FROM merchant_mappings")
+    removed = before - cursor.fetchone()[0]
+    conn.commit()
+    return removed
@@ -0,0 +1,22 @@
+#!/usr/bin/env python
+"""Recompute the monthly_rollups and account_balances tables from transactions.
+
+Run from the backend directory after editing finance_tracker.db outside
+the API (e.g. with one of the sqlite3 migration scripts).
+"""
+from main import SessionLocal, rebuild_monthly_rollups, verify_account_balances
+
+
+def rebuild_rollups():
+    db = SessionLocal()
+    try:
+        count = rebuild_monthly_rollups(db)
+        print(f"✓ Rebuilt {count} monthly rollup rows")
+        report = verify_account_balances(db, rebuild=True)
+        print(f"✓ Rebuilt {report['accounts']} account balances ({report['drifted']} had drifted)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    rebuild_rollups()
@@ -0,0 +1,206 @@
+"""
+Parsers for the bank and credit card statement layouts in input_data.
+
+Every layout is a StatementFormat registered in STATEMENT_FORMATS. A format
+says which files it handles and how to find its header row and its title,
+amount and date columns. parse_statement picks those columns once per file
+and extracts the whole sheet with column operations.
+
+Used by create_smart_mappings.py and by POST /api/import/statement.
+"""
+import re
+
+import pandas as pd
+
+# Columns (and dtypes) of every parsed statement
+STATEMENT_DTYPES = {
+    'statement_title': 'object',
+    'clean_title': 'object',
+    'amount': 'float64',
+    'date': 'datetime64[ns]',
+    'is_income': 'bool',
+}
+STATEMENT_COLUMNS = list(STATEMENT_DTYPES)
+
+# Only this many leading rows are searched for the header row
+HEADER_SEARCH_ROWS = 50
+# A plain decimal number, once separators and the currency sign are gone
+NUMBER_PATTERN = r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?'
+
+
+class StatementFormat:
+    """Column detection rules for one statement layout.
+
+    Header cells are matched case-insensitively against the regex patterns,
+    earlier patterns first. The header row is the first row that has both
+    a title and an amount column. With several amount columns (withdrawal
+    and deposit), each line takes the first positive one; income_patterns
+    mark the amount columns that are money coming in.
+    """
+
+    def __init__(self, name, file_pattern, title_patterns, amount_patterns,
+                 date_patterns=(r'date',), income_patterns=(), max_amount=None):
+        self.name = name
+        self.file_pattern = file_pattern
+        self.title_patterns = title_patterns
+        self.amount_patterns = amount_patterns
+        self.date_patterns = date_patterns
+        self.income_patterns = income_patterns
+        self.max_amount = max_amount
+
+    def matches_file(self, file_name):
+        return re.search(self.file_pattern, file_name) is not None
+
+    def find_columns(self, header):
+        """Positions of the date, title and amount columns in a header row,
+        or None if the row is not this format's header"""
+        cells = [str(cell).strip().lower() if pd.notna(cell) else '' for cell in header]
+
+        def first(patterns, exclude=()):
+            for pattern in patterns:
+                for i, cell in enumerate(cells):
+                    if cell and i not in exclude and re.search(pattern, cell):
+                        return i
+            return None
+
+        date = first(self.date_patterns)
+        title = first(self.title_patterns, exclude={date})
+        amounts = []
+        for pattern in self.amount_patterns:
+            for i, cell in enumerate(cells):
+                if cell and i not in amounts and i not in (date, title) and re.search(pattern, cell):
+                    amounts.append(i)
+        if title is None or not amounts:
+            return None
+        incomes = {i for i in amounts
+                   if any(re.search(pattern, cells[i]) for pattern in self.income_patterns)}
+        return {'date': date, 'title': title, 'amounts': amounts, 'incomes': incomes}
+
+    def find_header(self, rows):
+        """(row index, columns) of the header row, or None"""
+        for index, row in enumerate(rows[:HEADER_SEARCH_ROWS]):
+            columns = self.find_columns(row)
+            if columns:
+                return index, columns
+        return None
+
+
+STATEMENT_FORMATS = []
+
+
+def register_statement_format(statement_format):
+    """Add a layout; formats registered later are tried last"""
+    STATEMENT_FORMATS.append(statement_format)
+    return statement_format
+
+
+register_statement_format(StatementFormat(
+    'hdfc_account', r'Acct_Statement',
+    title_patterns=(r'narration', r'description'),
+    amount_patterns=(r'withdrawal', r'deposit'),
+    income_patterns=(r'deposit',),
+    max_amount=1000000))
+register_statement_format(StatementFormat(
+    'cc_2026', r'CC_Statement_2026',
+    title_patterns=(r'^transaction details$',),
+    amount_patterns=(r'^amount \(inr\)$',)))
+register_statement_format(StatementFormat(
+    'cc_2025', r'CC_Statement_2025',
+    title_patterns=(r'transaction', r'description', r'details'),
+    amount_patterns=(r'amount',),
+    max_amount=1000000))
+register_statement_format(StatementFormat(
+    'cc_past', r'CCStatement_Past',
+    title_patterns=(r'transaction', r'narration'),
+    amount_patterns=(r'amount',)))
+
+
+def get_statement_format(name):
+    for statement_format in STATEMENT_FORMATS:
+        if statement_format.name == name:
+            return statement_format
+    return None
+
+
+def detect_statement_format(file_name, rows):
+    """The format named by the file, else the first whose header is found"""
+    for statement_format in STATEMENT_FORMATS:
+        if statement_format.matches_file(file_name):
+            return statement_format
+    for statement_format in STATEMENT_FORMATS:
+        if statement_format.find_header(rows):
+            return statement_format
+    return None
+
+
+def read_statement_rows(source, file_name):
+    """Cell values of a statement's first sheet (or CSV) as raw rows"""
+    if file_name.lower().endswith('.csv'):
+        raw = pd.read_csv(source, header=None, dtype=object)
+    else:
+        raw = pd.read_excel(source, sheet_name=0, header=None, dtype=object)
+    return raw.values.tolist()
+
+
+def clean_amounts(values):
+    """Amount column to floats, dropping thousands separators and the rupee
+    sign; NaN where the cell is not a number"""
+    text = values.astype(str).str.replace(r'[,₹\s]', '', regex=True)
+    # astype(float) parses exactly like float(); to_numeric can be off by
+    # one in the last digit
+    return text.where(text.str.fullmatch(NUMBER_PATTERN)).astype(float)
+
+
+def clean_upi_titles(titles):
+    """clean_upi_title over a Series of stripped titles: the payee of
+    UPI/... and UPICC/... titles, other titles unchanged"""
+    payee = titles.str.split('/').str[1].str.strip()
+    is_upi = titles.str.upper().str.startswith(('UPI/', 'UPICC/'))
+    return titles.mask(is_upi & payee.fillna('').ne(''), payee)
+
+
+def empty_statement():
+    return pd.DataFrame({column: pd.Series(dtype=dtype)
+                         for column, dtype in STATEMENT_DTYPES.items()})
+
+
+def parse_statement(rows, statement_format):
+    """Statement lines of rows in statement_format, as a DataFrame with
+    STATEMENT_COLUMNS. Lines without a title or a positive amount are
+    dropped."""
+    header = statement_format.find_header(rows)
+    if header is None:
+        return empty_statement()
+    header_index, columns = header
+    data = pd.DataFrame(rows[header_index + 1:])
+    if data.empty:
+        return empty_statement()
+
+    titles = data[columns['title']]
+    titles = titles.where(titles.notna(), '').astype(str).str.strip()
+
+    amount = pd.Series(float('nan'), index=data.index)
+    is_income = pd.Series(False, index=data.index)
+    for i in columns['amounts']:
+        column_amount = clean_amounts(data[i])
+        fill = amount.isna() & (column_amount > 0)
+        amount = amount.mask(fill, column_amount)
+        is_income = is_income | (fill & (i in columns['incomes']))
+
+    if columns['date'] is not None:
+        dates = pd.to_datetime(data[columns['date']], errors='coerce', dayfirst=True, format='mixed')
+    else:
+        dates = pd.Series(pd.NaT, index=data.index, dtype='datetime64[ns]')
+
+    keep = (titles.str.len() > 3) & (amount > 0)
+    if statement_format.max_amount is not None:
+        keep &= amount < statement_format.max_amount
+
+    titles = titles[keep]
+    return pd.DataFrame({
+        'statement_title': titles,
+        'clean_title': clean_upi_titles(titles),
+        'amount': amount[keep],
+        'date': dates[keep],
+        'is_income': is_income[keep],
+    }).astype(STATEMENT_DTYPES).reset_index(drop=True)
@@ -0,0 +1,92 @@
+"""
+Statement counts of GET /api/transactions and /api/transactions/summary,
+against a scratch database.
+
+A page must come from one SELECT, with account and category names joined
+in, whatever its size, and so must the totals of every matching row. The response cache middleware also reads the data
+version (a primary-key lookup on data_versions), which is not counted.
+
+Usage: python -m pytest -q test_transaction_queries.py
+"""
+import os
+import sys
+
+import pytest
+from sqlalchemy import event
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture(scope="module")
+def app(tmp_path_factory):
+    workdir = tmp_path_factory.mktemp("transaction_queries")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    # main binds its engine to DATABASE_URL when imported
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir / 'test.db'}"
+    sys.path.insert(0, BACKEND_DIR)
+    try:
+        import main
+        from fastapi.testclient import TestClient
+        from generate_data import generate
+
+        generate(main, 1000)
+        yield main, TestClient(main.app)
+    finally:
+        os.chdir(cwd)
+
+
+def count_selects(main, client, params, path="/api/transactions"):
+    """(response, SELECTs run while serving it)"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(main.engine, "before_cursor_execute", record)
+    try:
+        response = client.get(path, params=params)
+    finally:
+        event.remove(main.engine, "before_cursor_execute", record)
+    selects = [s for s in statements
+               if s.lstrip().upper().startswith("SELECT") and "data_versions" not in s]
+    return response, selects
+
+
+@pytest.mark.parametrize("limit", [10, 500])
+def test_page_is_one_select(app, limit):
+    main, client = app
+    response, selects = count_selects(main, client, {"limit": limit})
+    assert response.status_code == 200
+    rows = response.json()
+    assert len(rows) == limit
+    assert all(row["account_name"] and row["category_name"] for row in rows)
+    assert len(selects) == 1, selects
+
+
+@pytest.mark.parametrize("limit", [10, 500])
+def test_cursor_page_is_one_select(app, limit):
+    main, client = app
+    first = client.get("/api/transactions", params={"limit": limit})
+    cursor = first.headers["X-Next-Cursor"]
+    response, selects = count_selects(main, client, {"limit": limit, "cursor": cursor})
+    assert response.status_code == 200
+    assert len(response.json()) == limit
+    assert len(selects) == 1, selects
+
+
+@pytest.mark.parametrize("params", [{}, {"account_id": 2}, {"search": "swiggy"}])
+def test_summary_covers_every_match(app, params):
+    main, client = app
+    rows = client.get("/api/transactions", params=dict(params, limit=100000)).json()
+    response, selects = count_selects(main, client, params, "/api/transactions/summary")
+    assert response.status_code == 200
+    summary = response.json()
+    assert summary["count"] == len(rows)
+    by_account = {}
+    for row in rows:
+        signed = row["amount"] if row["is_income"] else -row["amount"]
+        by_account[row["account_name"]] = by_account.get(row["account_name"], 0) + signed
+    assert summary["total"] == pytest.approx(sum(by_account.values()))
+    assert {a["account_name"]: a["total"] for a in summary["accounts"]} == pytest.approx(by_account)
+    assert len(selects) == 1, selects
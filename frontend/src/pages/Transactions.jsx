@@ -1,13 +1,15 @@
 import React, { useState, useEffect } from 'react';
 import { Plus, FileDown, X, RefreshCcw, Search, Trash2 } from 'lucide-react';
 import * as XLSX from 'xlsx';
-import { fetchTransactions, fetchAccounts, fetchCategories, updateTransaction, createTransaction, deleteTransaction } from '../utils/api';
+import { fetchTransactionsPage, fetchTransactionsSummary, fetchAllTransactions, fetchAccounts, fetchCategories, updateTransaction, createTransaction, deleteTransaction } from '../utils/api';
 import { formatCurrency, formatDate, formatMonth, formatDateTimeForInput } from '../utils/formatters';
-import { calculateTotalAmount, calculateSumByAccount } from '../utils/constants';
 import { themes } from '../config/themes';
 
 function Transactions({ currentTheme }) {
   const [transactions, setTransactions] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [summary, setSummary] = useState({ count: 0, total: 0, accounts: [] });
+  const [loadingMore, setLoadingMore] = useState(false);
   const [accounts, setAccounts] = useState([]);
   const [categories, setCategories] = useState([]);
   const [showAddTransaction, setShowAddTransaction] = useState(false);
@@ -35,18 +37,47 @@ function Transactions({ currentTheme }) {
     return `${year}-${month}-${day}`;
   };
 
-  // Load data
+  const filters = React.useMemo(() => ({
+    search: searchTerm,
+    categoryId: filterCategory,
+    accountId: filterAccount,
+    startDate: filterStartDate,
+    endDate: filterEndDate
+  }), [searchTerm, filterCategory, filterAccount, filterStartDate, filterEndDate]);
+
+  // Load the first page of transactions again, e.g. after an edit, with
+  // the totals of everything that matches the filters
+  const reloadTransactions = React.useCallback(async () => {
+    const [page, totals] = await Promise.all([
+      fetchTransactionsPage(filters),
+      fetchTransactionsSummary(filters)
+    ]);
+    setTransactions(page.items);
+    setNextCursor(page.nextCursor);
+    setSummary(totals);
+  }, [filters]);
+
   // Load data
   const loadData = React.useCallback(async () => {
-    const [txnData, accData, catData] = await Promise.all([
-      fetchTransactions(searchTerm, filterCategory, filterAccount, filterStartDate, filterEndDate),
+    const [, accData, catData] = await Promise.all([
+      reloadTransactions(),
       fetchAccounts(),
       fetchCategories()
     ]);
-    setTransactions(txnData);
     setAccounts(accData);
     setCategories(catData);
-  }, [searchTerm, filterCategory, filterAccount, filterStartDate, filterEndDate]);
+  }, [reloadTransactions]);
+
+  const handleLoadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const page = await fetchTransactionsPage(filters, nextCursor);
+      setTransactions(prev => [...prev, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
   useEffect(() => {
     loadData();
@@ -87,8 +118,7 @@ function Transactions({ currentTheme }) {
       });
 
       if (response.ok) {
-        const updatedTxns = await fetchTransactions(searchTerm, filterCategory, filterAccount, filterStartDate, filterEndDate);
-        setTransactions(updatedTxns);
+        await reloadTransactions();
         setEditingRowId(null);
         setEditingData({});
         setShowModifyTransaction(false);
@@ -124,8 +154,7 @@ function Transactions({ currentTheme }) {
       });
 
       if (response.ok) {
-        const updatedTxns = await fetchTransactions(searchTerm, filterCategory, filterAccount, filterStartDate, filterEndDate);
-        setTransactions(updatedTxns);
+        await reloadTransactions();
         setCopiedRowId(null);
         setCopiedData({});
         alert('Transaction copied and saved successfully!');
@@ -153,14 +182,23 @@ function Transactions({ currentTheme }) {
     }
   };
 
-  // Export transactions to Excel
-  const handleExportExcel = () => {
-    if (filteredTransactions.length === 0) {
+  // Export every transaction matching the filters to Excel, not just the
+  // pages loaded so far
+  const handleExportExcel = async () => {
+    let allTransactions;
+    try {
+      allTransactions = await fetchAllTransactions(filters);
+    } catch (error) {
+      console.error('Error exporting transactions:', error);
+      alert('Failed to export transactions');
+      return;
+    }
+    if (allTransactions.length === 0) {
       alert('No transactions to export');
       return;
     }
 
-    const exportData = filteredTransactions.map(transaction => ({
+    const exportData = allTransactions.map(transaction => ({
       'Date': formatDate(transaction.date),
       'Title': transaction.title,
       'Category': transaction.category_name,
@@ -325,11 +363,11 @@ function Transactions({ currentTheme }) {
           <div style={{ display: 'flex', flexDirection: 'column', justifyContent: 'center', height: '100%' }}>
             <h3 style={{ color: theme.text, marginBottom: '0.5rem', fontSize: '0.875rem', fontWeight: 600 }}>Transactions</h3>
             <span style={{ fontSize: '2rem', fontWeight: 700, color: theme.primary, marginBottom: '1.5rem' }}>
-              {filteredTransactions.length}
+              {summary.count}
             </span>
             <h3 style={{ color: theme.text, marginBottom: '0.5rem', fontSize: '0.875rem', fontWeight: 600 }}>Overall Total</h3>
-            <span style={{ fontSize: '2rem', fontWeight: 700, color: calculateTotalAmount(filteredTransactions) >= 0 ? theme.secondary : '#ef4444' }}>
-              {calculateTotalAmount(filteredTransactions) >= 0 ? '+' : ''}{formatCurrency(calculateTotalAmount(filteredTransactions))}
+            <span style={{ fontSize: '2rem', fontWeight: 700, color: summary.total >= 0 ? theme.secondary : '#ef4444' }}>
+              {summary.total >= 0 ? '+' : ''}{formatCurrency(summary.total)}
             </span>
           </div>
         </div>
@@ -338,7 +376,7 @@ function Transactions({ currentTheme }) {
         <div style={{ flex: 1, padding: '1.5rem', background: theme.accentLight, borderRadius: '8px' }}>
           <h3 style={{ marginBottom: '1rem', color: theme.text, fontSize: '0.875rem', fontWeight: 600 }}>Account-wise Summary</h3>
           <div style={{ display: 'grid', gridTemplateColumns: 'repeat(auto-fit, minmax(200px, 1fr))', gap: '1rem' }}>
-            {Object.entries(calculateSumByAccount(filteredTransactions)).map(([accountName, sum]) => (
+            {summary.accounts.map(({ account_name: accountName, total: sum }) => (
               <div
                 key={accountName}
                 style={{
@@ -673,6 +711,14 @@ function Transactions({ currentTheme }) {
         </tbody>
       </table>
 
+      {nextCursor && (
+        <div style={{ display: 'flex', justifyContent: 'center', marginTop: '1rem' }}>
+          <button className="btn btn-primary" onClick={handleLoadMore} disabled={loadingMore}>
+            {loadingMore ? 'Loading...' : 'Load more'}
+          </button>
+        </div>
+      )}
+
       {/* Add Transaction Modal */}
       {showAddTransaction && (
         <AddTransactionModal
@@ -681,8 +727,7 @@ function Transactions({ currentTheme }) {
           onClose={() => setShowAddTransaction(false)}
           onSuccess={async () => {
             setShowAddTransaction(false);
-            const updatedTxns = await fetchTransactions(searchTerm, filterCategory, filterAccount, filterStartDate, filterEndDate);
-            setTransactions(updatedTxns);
+            await reloadTransactions();
           }}
         />
       )}
@@ -1,7 +1,7 @@
 import React, { useState } from 'react';
 import { Upload, X, FileDown, GitCompare, Tag } from 'lucide-react';
 import * as XLSX from 'xlsx';
-import { fetchAccounts, fetchCategories, fetchMerchantMappings, API_BASE } from '../utils/api';
+import { fetchAccounts, fetchCategories, fetchMerchantMappings, createTransactionsBulk, submitImportJob, waitForImportJob, parseStatement, API_BASE } from '../utils/api';
 import { formatCurrency, formatDate, formatDateTimeForInput } from '../utils/formatters';
 import { parseAmount, determineIsIncome, cleanUpiTitle, autoDetectColumns } from '../utils/constants';
 import { themes } from '../config/themes';
@@ -139,6 +139,24 @@ function Utility({ currentTheme, defaultSection = 'import', hideSelector = false
     }
   }, [selectedUtility]);
 
+  // Statement lines from the server-side parsers, shaped like sheet rows so
+  // autoDetectColumns maps them; null when the server does not know the layout
+  const parseStatementRows = async (file) => {
+    try {
+      const parsed = await parseStatement(file);
+      if (!parsed || parsed.count === 0) return null;
+      return parsed.rows.map(row => ({
+        Date: row.date,
+        Title: row.statement_title,
+        Amount: row.amount,
+        Type: row.is_income ? 'CR' : 'DR'
+      }));
+    } catch (error) {
+      console.log('Server-side statement parsing unavailable:', error.message);
+      return null;
+    }
+  };
+
   const handleImportXLSX = async (e) => {
     const file = e.target.files[0];
     if (!file) return;
@@ -146,10 +164,14 @@ function Utility({ currentTheme, defaultSection = 'import', hideSelector = false
     const reader = new FileReader();
     reader.onload = async (event) => {
       try {
-        const data = new Uint8Array(event.target.result);
-        const workbook = XLSX.read(data, { type: 'array' });
-        const worksheet = workbook.Sheets[workbook.SheetNames[0]];
-        const jsonData = XLSX.utils.sheet_to_json(worksheet);
+        // Known bank layouts are parsed on the server; anything else is read as a plain sheet
+        let jsonData = await parseStatementRows(file);
+        if (!jsonData) {
+          const data = new Uint8Array(event.target.result);
+          const workbook = XLSX.read(data, { type: 'array' });
+          const worksheet = workbook.Sheets[workbook.SheetNames[0]];
+          jsonData = XLSX.utils.sheet_to_json(worksheet);
+        }
 
         if (jsonData.length === 0) {
           showNotification('File is empty', 'error');
@@ -483,15 +505,19 @@ function Utility({ currentTheme, defaultSection = 'import', hideSelector = false
     });
 
     try {
-      for (const record of recordsToImport) {
-        await fetch(`${API_BASE}/transactions`, {
-          method: 'POST',
-          headers: { 'Content-Type': 'application/json' },
-          body: JSON.stringify(record)
-        });
-      }
+      const job = await submitImportJob(recordsToImport);
+      const result = await waitForImportJob(job.id, progress => {
+        showNotification(`Importing... ${progress.rows_parsed}/${recordsToImport.length}`, 'success');
+      });
 
-      showNotification(`Successfully imported ${recordsToImport.length} transactions!`, 'success');
+      if (result.status === 'failed') {
+        throw new Error(result.error || 'Import job failed');
+      }
+      if (result.rows_failed > 0) {
+        showNotification(`Imported ${result.rows_inserted} transactions, ${result.rows_failed} failed`, 'error');
+      } else {
+        showNotification(`Successfully imported ${result.rows_inserted} transactions!`, 'success');
+      }
       setImportedData([]);
       setSelectedImports(new Set());
       setShowImportConfirm(false);
@@ -684,18 +710,13 @@ function Utility({ currentTheme, defaultSection = 'import', hideSelector = false
     };
 
     try {
-      const response = await fetch(`${API_BASE}/transactions`, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify(payload)
-      });
+      const { results } = await createTransactionsBulk([payload]);
 
-      if (!response.ok) {
-        const err = await response.json();
-        throw new Error(err.detail || 'Failed to insert');
+      if (results[0].status !== 'created') {
+        throw new Error(results[0].detail || 'Failed to insert');
       }
 
-      const newTx = await response.json();
+      const newTx = results[0].transaction;
       showNotification('Transaction inserted', 'success');
 
       // Update state to show as matched
@@ -8,15 +8,46 @@ export const fetchOverview = async () => {
   return data;
 };
 
-export const fetchTransactions = async (searchTerm = '', filterCategory = '', filterAccount = '', filterStartDate = '', filterEndDate = '') => {
-  const searchParam = searchTerm ? `&search=${encodeURIComponent(searchTerm)}` : '';
-  const categoryParam = filterCategory ? `&category_id=${filterCategory}` : '';
-  const accountParam = filterAccount ? `&account_id=${filterAccount}` : '';
-  const startDateParam = filterStartDate ? `&start_date=${filterStartDate}` : '';
-  const endDateParam = filterEndDate ? `&end_date=${filterEndDate}` : '';
-  const response = await fetch(`${API_BASE}/transactions?limit=1000${searchParam}${categoryParam}${accountParam}${startDateParam}${endDateParam}`);
-  const data = await response.json();
-  return data;
+// Query parameters of the Transactions screen filters
+const transactionFilterParams = (filters = {}, extra = {}) => {
+  const params = new URLSearchParams(extra);
+  if (filters.search) params.set('search', filters.search);
+  if (filters.categoryId) params.set('category_id', filters.categoryId);
+  if (filters.accountId) params.set('account_id', filters.accountId);
+  if (filters.startDate) params.set('start_date', filters.startDate);
+  if (filters.endDate) params.set('end_date', filters.endDate);
+  return params;
+};
+
+// One page of transactions, newest first. Pass the returned nextCursor back
+// in to get the following page; it is null after the last page.
+export const fetchTransactionsPage = async (filters = {}, cursor = '', limit = 200) => {
+  const params = transactionFilterParams(filters, { limit, order: 'date' });
+  if (cursor) params.set('cursor', cursor);
+  const response = await fetch(`${API_BASE}/transactions?${params}`);
+  const items = await response.json();
+  return { items, nextCursor: response.headers.get('X-Next-Cursor') };
+};
+
+// Count and net totals, overall and per account, of every matching
+// transaction rather than just the pages loaded so far
+export const fetchTransactionsSummary = async (filters = {}) => {
+  const response = await fetch(`${API_BASE}/transactions/summary?${transactionFilterParams(filters)}`);
+  if (!response.ok) {
+    throw new Error('Failed to load transaction totals');
+  }
+  return response.json();
+};
+
+// Every matching transaction, newest first, read from the NDJSON export
+export const fetchAllTransactions = async (filters = {}) => {
+  const params = transactionFilterParams(filters, { format: 'ndjson' });
+  const response = await fetch(`${API_BASE}/transactions/export?${params}`);
+  if (!response.ok) {
+    throw new Error('Failed to export transactions');
+  }
+  const text = await response.text();
+  return text.split('\n').filter(line => line).map(line => JSON.parse(line));
 };
 
 export const fetchAccounts = async () => {
@@ -96,9 +127,73 @@ export const createTransaction = async (data) => {
   return response;
 };
 
+// Create many transactions in one request; resolves to { created, failed, results }
+export const createTransactionsBulk = async (records) => {
+  const response = await fetch(`${API_BASE}/transactions/bulk`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(records)
+  });
+  if (!response.ok) {
+    const err = await response.json().catch(() => ({}));
+    throw new Error(err.detail || 'Bulk insert failed');
+  }
+  return response.json();
+};
+
+// Queue records as a background import job; resolves to the job status
+export const submitImportJob = async (records) => {
+  const response = await fetch(`${API_BASE}/import/jobs/transactions`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(records)
+  });
+  if (!response.ok) {
+    const err = await response.json().catch(() => ({}));
+    throw new Error(err.detail || 'Failed to start import');
+  }
+  return response.json();
+};
+
+// Poll an import job until it finishes, reporting progress along the way
+export const waitForImportJob = async (jobId, onProgress = () => {}, intervalMs = 1000) => {
+  for (;;) {
+    const response = await fetch(`${API_BASE}/import/jobs/${jobId}`);
+    if (!response.ok) {
+      const err = await response.json().catch(() => ({}));
+      throw new Error(err.detail || `Import job ${jobId} could not be read`);
+    }
+    const job = await response.json();
+    onProgress(job);
+    if (job.status === 'completed' || job.status === 'failed') {
+      return job;
+    }
+    await new Promise(resolve => setTimeout(resolve, intervalMs));
+  }
+};
+
 export const deleteTransaction = async (id) => {
   const response = await fetch(`${API_BASE}/transactions/${id}`, {
     method: 'DELETE'
   });
   return response;
 };
+
+// Parse a bank/card statement with the server-side parsers.
+// Resolves to { format, count, rows }, or null when the layout is not recognised
+export const parseStatement = async (file) => {
+  const formData = new FormData();
+  formData.append('file', file);
+  const response = await fetch(`${API_BASE}/import/statement`, {
+    method: 'POST',
+    body: formData
+  });
+  if (response.status === 422) {
+    return null;
+  }
+  if (!response.ok) {
+    const err = await response.json().catch(() => ({}));
+    throw new Error(err.detail || 'Failed to parse statement');
+  }
+  return response.json();
+};
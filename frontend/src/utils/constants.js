@@ -1,24 +1,5 @@
 // Constants and shared utilities
 
-export const calculateTotalAmount = (transactionList) => {
-  return transactionList.reduce((sum, transaction) => {
-    if (transaction.category_name === 'Balance Correction') return sum;
-    return sum + (transaction.is_income ? transaction.amount : -transaction.amount);
-  }, 0);
-};
-
-export const calculateSumByAccount = (transactionList) => {
-  const sumByAccount = {};
-  transactionList.forEach(transaction => {
-    if (transaction.category_name === 'Balance Correction') return;
-    if (!sumByAccount[transaction.account_name]) {
-      sumByAccount[transaction.account_name] = 0;
-    }
-    sumByAccount[transaction.account_name] += (transaction.is_income ? transaction.amount : -transaction.amount);
-  });
-  return sumByAccount;
-};
-
 export const autoDetectColumns = (columns) => {
   const mapping = {
     title: '',